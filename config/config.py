@@ -18,4 +18,9 @@ KOSPI_TELEGRAM_CHAT_ID = os.getenv("KOSPI_TELEGRAM_CHAT_ID")
 
 # 실행 시간 설정
 TQQQ_EXECUTION_TIME = os.getenv("TQQQ_EXECUTION_TIME", "09:00")  # 오전 9시, 24시간 형식
-KOSPI_EXECUTION_TIME = os.getenv("KOSPI_EXECUTION_TIME", "17:00")  # 오후 5시, 24시간 형식 
\ No newline at end of file
+KOSPI_EXECUTION_TIME = os.getenv("KOSPI_EXECUTION_TIME", "17:00")  # 오후 5시, 24시간 형식 
+# KRX 동시 요청 수 (너무 크면 KRX 서버에서 차단될 수 있음)
+KRX_MAX_WORKERS = int(os.getenv("KRX_MAX_WORKERS", "16"))
+
+# 파동주 알림 최대 종목 수 (0이면 제한 없음, 도달하면 남은 종목 분석 중단)
+WAVE_MAX_RESULTS = int(os.getenv("WAVE_MAX_RESULTS", "0"))
@@ -23,6 +23,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 한국 시간대 (호출마다 생성하지 않도록 한 번만 생성)
+KR_TZ = pytz.timezone('Asia/Seoul')
+
 def setup_schedules():
     """스케줄 설정"""
     # TQQQ 알림 (오전 9시)
@@ -37,7 +40,7 @@ def setup_schedules():
 
 def run_stock_analysis():
     """급등주와 파동주 분석 실행"""
-    kr_time = datetime.now(pytz.timezone('Asia/Seoul'))
+    kr_time = datetime.now(KR_TZ)
     
     # 주말에는 실행하지 않음
     if kr_time.weekday() >= 5:  # 5: 토요일, 6: 일요일
@@ -66,7 +69,7 @@ def run_stock_analysis():
 
 def run_tqqq_alert():
     """TQQQ 알림 실행"""
-    kr_time = datetime.now(pytz.timezone('Asia/Seoul'))
+    kr_time = datetime.now(KR_TZ)
     
     # 주말에는 실행하지 않음
     if kr_time.weekday() >= 5:  # 5: 토요일, 6: 일요일
@@ -89,7 +92,9 @@ def run_scheduler():
     while True:
         try:
             schedule.run_pending()
-            time.sleep(30)  # 30초마다 체크
+            # 30초마다 깨어나는 대신 다음 작업 예정 시각까지 대기
+            idle = schedule.idle_seconds()
+            time.sleep(max(1, idle) if idle is not None else 60)
         except Exception as e:
             logger.error(f"스케줄러 실행 중 오류 발생: {str(e)}")
             time.sleep(60)  # 오류 발생 시 1분 대기
@@ -154,14 +159,27 @@ def run_specific_analysis(analysis_type):
     
     logger.info(f"{analysis_type} 분석 실행 완료")
 
+def enable_debug_logging():
+    """분석 스크립트의 디버그 로그 활성화"""
+    logging.getLogger().setLevel(logging.DEBUG)
+    for name in ('scripts.tqqq_analysis', 'scripts.potential_stock_finder', 'scripts.wave_analysis'):
+        script_logger = logging.getLogger(name)
+        script_logger.setLevel(logging.DEBUG)
+        for handler in script_logger.handlers:
+            handler.setLevel(logging.DEBUG)
+
 def main():
     parser = argparse.ArgumentParser(description='텔레그램 주식 알림 봇')
     parser.add_argument('--run', choices=['all', 'tqqq', 'potential', 'wave'], 
                         help='즉시 특정 분석을 실행 (all: 모든 분석, tqqq: TQQQ 알림, potential: 급등주 분석, wave: 파동주 분석)')
     parser.add_argument('--init-db', action='store_true', help='데이터베이스 초기화')
+    parser.add_argument('--debug', action='store_true', help='디버그 로그 출력')
     
     args = parser.parse_args()
     
+    if args.debug:
+        enable_debug_logging()
+    
     # 데이터베이스 초기화
     if args.init_db:
         logger.info("데이터베이스 초기화 중...")
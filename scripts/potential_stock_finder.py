@@ -2,20 +2,25 @@ import pandas as pd
 import numpy as np
 from pykrx import stock
 from datetime import datetime, timedelta
-from collections import Counter
-from tqdm import tqdm
+from functools import lru_cache
 import time
-from multiprocessing import Pool, cpu_count
+from concurrent.futures import ThreadPoolExecutor
 import pytz
-import os
+import re
 import logging
-import sys
+import queue
+import atexit
+from logging.handlers import QueueHandler, QueueListener
 import traceback
 import requests
 
 from utils.telegram_service import send_telegram_message
 from utils.database import save_stock_data
-from config.config import KOSPI_EXECUTION_TIME
+from utils.file_cache import cached
+from utils.krx_session import install_krx_session
+from utils.jit import njit, prange, NUMBA_AVAILABLE
+from utils.scheduling import next_run_time, seconds_until
+from config.config import KOSPI_EXECUTION_TIME, KRX_MAX_WORKERS
 
 # 로깅 설정
 logger = logging.getLogger(__name__)
@@ -24,20 +29,50 @@ formatter = logging.Formatter('%(asctime)s [%(levelname)s] %(message)s')
 
 # 파일 핸들러
 file_handler = logging.FileHandler('potential_stock_finder.log')
-file_handler.setLevel(logging.INFO)
 file_handler.setFormatter(formatter)
 
 # 콘솔 핸들러
 console_handler = logging.StreamHandler()
-console_handler.setLevel(logging.INFO)
 console_handler.setFormatter(formatter)
 
-logger.addHandler(file_handler)
-logger.addHandler(console_handler)
-
-# 글로벌 변수
-start_date = None
-end_date = None
+# 스레드에서 로그를 남길 때 파일/콘솔 쓰기를 기다리지 않도록 큐에 넣고
+# 별도 리스너 스레드가 실제 핸들러로 기록
+# (핸들러 레벨은 지정하지 않고 로거 레벨로만 거르므로 --debug 시 로거 레벨만 낮추면 됨)
+log_queue = queue.Queue(-1)
+logger.addHandler(QueueHandler(log_queue))
+log_listener = QueueListener(log_queue, file_handler, console_handler)
+log_listener.start()
+atexit.register(log_listener.stop)
+
+# 한국 시간대와 실행 예정 시각 (폴링마다 다시 계산하지 않도록 한 번만 계산)
+KR_TZ = pytz.timezone('Asia/Seoul')
+TARGET_H, TARGET_M = map(int, KOSPI_EXECUTION_TIME.split(':'))
+
+# 수집 기간 (일) - 가장 긴 120일 이동평균에 필요한 거래일과 공휴일 여유분
+# 급등주 조건은 최근 120거래일만 사용하므로 1년치를 받을 필요가 없음
+LOOKBACK_DAYS = 200
+MIN_PANEL_DAYS = 120
+
+# 분석 대상 시가총액 상한 (2조원 이상은 제외)
+MAX_MARKET_CAP = 2_000_000_000_000
+
+# 분석 제외 종목 조건 (우선주 및 스팩주 등)
+EXCLUDED_CODE_SUFFIXES = ('5', '7', '9')
+EXCLUDED_CODE_PREFIXES = ('43',)
+EXCLUDED_NAME_PATTERN = re.compile('우|스팩')
+
+# pykrx 요청 간 HTTP 연결 재사용
+install_krx_session(KRX_MAX_WORKERS)
+
+# pykrx 조회 결과 디스크 캐시 (확정된 지난 기간 조회는 1년, 조회일 당일에 받은 결과는 12시간 유지)
+# KRX 조회 실패로 비어 있거나 일부만 받은 종목 목록은 캐시하지 않음 (다음 실행에서 재시도)
+get_market_ticker_list = cached(validate=lambda tickers: len(tickers) > 100)(stock.get_market_ticker_list)
+get_market_ohlcv_by_ticker = cached()(stock.get_market_ohlcv_by_ticker)
+get_market_cap_by_ticker = cached()(stock.get_market_cap_by_ticker)
+get_market_price_change_by_ticker = cached()(stock.get_market_price_change_by_ticker)
+get_market_net_purchases_of_equities = cached()(stock.get_market_net_purchases_of_equities)
+# 종목명은 날짜 인자가 없으므로 일주일만 유지
+get_market_ticker_name = cached(ttl=timedelta(days=7))(stock.get_market_ticker_name)
 
 def safe_stock_api_call(func, *args, retries=5, delay=3, **kwargs):
     """
@@ -88,282 +123,388 @@ def safe_stock_api_call(func, *args, retries=5, delay=3, **kwargs):
     logger.error(f"최대 재시도 횟수 초과 ({func.__name__}): 데이터를 가져올 수 없습니다")
     return None
 
-def get_first_workday_of_month(year, month):
-    """해당 월의 첫 영업일 구하기"""
-    date = pd.date_range(f"{year}-{month}-01", f"{year}-{month}-07", freq='B')[0]
-    return date.day
-
-def check_volume_spike(df):
-    """거래량 급증 여부 확인"""
-    try:
-        avg_vol_10 = df['거래량'].tail(11)[:-1].mean()
-        current_vol = df['거래량'].iloc[-1]
-        result = current_vol > avg_vol_10 * 2
-        print(f"  거래량 급증: avg_vol_10={avg_vol_10:.0f}, current_vol={current_vol:.0f}, result={result}")
-        return result
-    except Exception as e:
-        print(f"거래량 급등 분석 실패: {e}")
-        return False
-
-def check_market_cap(marcap):
-    """시가총액 조건 확인 (5000억 이상)"""
-    try:
-        result = marcap >= 500000000000
-        print(f"  시가총액: marcap={marcap:.0f}, result={result}")
-        return result
-    except Exception as e:
-        print(f"시총 분석 실패: {e}")
-        return False
-
-def check_close_to_ma240(df):
-    """종가가 240일 이동평균선 근처에 있는지 확인"""
-    try:
-        if len(df) < 240:
-            print(f"  MA240 체크: 데이터 부족으로 계산 불가 (len={len(df)})")
-            return False
-        ma240 = df['종가'].rolling(240).mean()
-        current_close = df['종가'].iloc[-1]
-        ma240_value = ma240.iloc[-1]
-        result = abs(current_close - ma240_value) / ma240_value < 0.10
-        print(f"  MA240 체크: close={current_close:.0f}, ma240={ma240_value:.0f}, result={result}")
-        return result
-    except Exception as e:
-        print(f"MA240 분석 실패: {e}")
-        return False
+@lru_cache(maxsize=4096)
+def _ticker_name(code):
+    """
+    종목명 조회 (한 번의 실행 안에서는 종목명이 바뀌지 않으므로 메모리에 보관)
+    
+    Args:
+        code: 종목코드
+    
+    Returns:
+        종목명 또는 실패 시 None
+    """
+    return safe_stock_api_call(get_market_ticker_name, code)
 
-def check_ma_transition(df):
-    """이동평균선 전환 확인 (20일선이 60일선 위로)"""
+def _ticker_name_or_none(code):
+    """
+    종목명 조회 (스레드 풀에서 사용, 예외 발생 시 None)
+    
+    Args:
+        code: 종목코드
+    
+    Returns:
+        종목명 또는 실패 시 None
+    """
     try:
-        if len(df) < 60:
-            print(f"  MA Transition: 데이터 부족으로 계산 불가 (len={len(df)})")
-            return False
-        ma20 = df['종가'].rolling(20).mean()
-        ma60 = df['종가'].rolling(60).mean()
-        ma20_recent = ma20.tail(5)
-        ma60_recent = ma60.tail(5)
-        crossover = (ma20_recent.iloc[-2] < ma60_recent.iloc[-2]) and (ma20_recent.iloc[-1] > ma60_recent.iloc[-1])
-        result = crossover or (ma20.iloc[-1] > ma60.iloc[-1])
-        print(f"  MA Transition: ma20={ma20.iloc[-1]:.0f}, ma60={ma60.iloc[-1]:.0f}, crossover={crossover}, result={result}")
-        return result
+        return _ticker_name(code)
     except Exception as e:
-        print(f"MA 전환 분석 실패: {e}")
-        return False
+        logger.warning(f"종목명 가져오기 실패 ({code}): {str(e)}")
+        return None
 
-def check_institutional_buying(code, start_date, end_date, window=20):
-    """기관 순매수 확인"""
-    try:
-        df_inst = stock.get_market_trading_value_by_investor(start_date.strftime('%Y%m%d'),
-                                                            end_date.strftime('%Y%m%d'),
-                                                            code,
-                                                            "연기금")
-        if not df_inst.empty and '매수' in df_inst.columns and '매도' in df_inst.columns:
-            inst_trend = (df_inst['매수'] - df_inst['매도']).tail(window).mean()
-            result = inst_trend > 0
-            print(f"  기관 매수 체크: inst_trend={inst_trend:.0f}, result={result}")
-            return result
-        print("  기관 매수 체크: 연기금 데이터 없음")
-        return False
-    except Exception as e:
-        print(f"기관 매수 분석 실패: {e}")
-        return False
+def get_ticker_names(date_str):
+    """
+    전 종목 종목명을 한 번의 조회로 가져오기
+    
+    Args:
+        date_str: 조회일 (YYYYMMDD)
+    
+    Returns:
+        dict: {종목코드: 종목명}, 실패 시 빈 딕셔너리
+    """
+    df = safe_stock_api_call(get_market_price_change_by_ticker, date_str, date_str, market="ALL")
+    if df is None or df.empty or '종목명' not in df.columns:
+        logger.warning("전 종목 종목명 조회 실패, 종목별로 조회합니다.")
+        return {}
+    return df['종목명'].to_dict()
 
-def process_stock(stock_info):
-    """종목 데이터 분석"""
-    global start_date, end_date
+def fetch_panel(start, end):
+    """
+    기간 내 전 종목 일별 OHLCV 패널 수집
     
-    try:
-        code, market_cap = stock_info
-        
-        # 날짜 검증
-        if start_date is None or end_date is None:
-            logger.error(f"날짜 변수가 초기화되지 않았습니다: start_date={start_date}, end_date={end_date}")
-            return None
-            
-        # 날짜 형식 문자열로 변환
-        try:
-            start_date_str = start_date.strftime('%Y%m%d')
-            end_date_str = end_date.strftime('%Y%m%d')
-        except Exception as e:
-            logger.error(f"날짜 형식 변환 오류 ({code}): {str(e)}")
-            return None
-        
-        # 거래량 급증 확인
-        df = safe_stock_api_call(
-            stock.get_market_ohlcv_by_date,
-            start_date_str,
-            end_date_str,
-            code,
-            adjusted=True
-        )
-        
-        if df is None or df.empty:
-            return None
-        
-        # 최소 100일 이상의 데이터가 필요
-        if len(df) < 100:
-            return None
-        
-        # 볼륨 분석
-        df['volume_ma20'] = df['거래량'].rolling(window=20).mean()
-        
-        # 최근 5일 동안 한 번이라도 거래량이 20일 평균보다 100% 이상 높은 경우
-        recent_volume_surge = df.iloc[-5:]['거래량'] > df.iloc[-5:]['volume_ma20'] * 2.0
-        if not recent_volume_surge.any():
-            return None
-        
-        # 가격 움직임 분석 - 최근 상승 확인
-        df['ma20'] = df['종가'].rolling(window=20).mean()
-        df['ma60'] = df['종가'].rolling(window=60).mean()
-        df['ma120'] = df['종가'].rolling(window=120).mean()
+    영업일마다 get_market_ohlcv_by_ticker로 전 종목 스냅샷을 한 번에 받아
+    (date, code) MultiIndex DataFrame으로 합칩니다. 스냅샷은 디스크 캐시를
+    거치므로 재실행 시에는 새로 추가된 영업일만 조회합니다.
+    
+    Args:
+        start: 시작일 (datetime)
+        end: 종료일 (datetime)
+    
+    Returns:
+        DataFrame: (date, code) MultiIndex OHLCV 패널 또는 실패 시 None
+    """
+    def fetch_snapshot(day_str):
+        return safe_stock_api_call(get_market_ohlcv_by_ticker, day_str, market="ALL")
+    
+    days = [day.strftime('%Y%m%d') for day in pd.bdate_range(start, end)]
+    
+    # 네트워크 대기가 대부분이므로 스레드로 영업일별 요청을 동시에 수행
+    with ThreadPoolExecutor(max_workers=KRX_MAX_WORKERS) as executor:
+        fetched = list(executor.map(fetch_snapshot, days))
+    
+    snapshots = {}
+    for day_str, snapshot in zip(days, fetched):
+        if snapshot is None:
+            logger.warning(f"OHLCV 스냅샷 수집 실패: {day_str}")
+            continue
         
-        # 최근 골든 크로스 (20일선이 60일선 위로) 확인
-        if df.iloc[-1]['ma20'] <= df.iloc[-1]['ma60']:
-            return None
+        # 휴장일은 빈 데이터 또는 거래량 0으로 내려옴
+        if snapshot.empty or (snapshot['거래량'] == 0).all():
+            continue
+        snapshots[pd.Timestamp(day_str)] = snapshot
+    
+    if not snapshots:
+        return None
+    
+    panel = pd.concat(snapshots, names=['date', 'code'])
+    logger.info(f"OHLCV 패널 수집 완료: {len(snapshots)}영업일, {panel.index.get_level_values('code').nunique()}개 종목")
+    return panel
+
+def panel_to_arrays(panel, min_width=120):
+    """
+    패널을 종목 × 거래일 2차원 배열(종가, 거래량)로 변환
+    
+    종목마다 자신의 거래일을 오른쪽 끝(최근)에 맞춰 채우므로 [:, -n:]이
+    종목별 최근 n개 거래일이 됩니다. 상장 전처럼 데이터가 없는 앞부분은
+    NaN으로 남아 rolling과 같이 기간이 부족한 평균은 NaN이 됩니다.
+    
+    Args:
+        panel: (date, code) MultiIndex OHLCV 패널
+        min_width: 배열의 최소 열 개수 (가장 긴 이동평균 기간 이상)
+    
+    Returns:
+        (codes, close, volume): 종목코드 리스트와 float64 2차원 배열 두 개
+    """
+    panel = panel.sort_index(level=['code', 'date'])
+    row, codes = pd.factorize(panel.index.get_level_values('code'))
+    # 각 행이 종목의 마지막 거래일에서 몇 번째 전인지
+    from_end = panel.groupby(level='code', sort=False).cumcount(ascending=False).to_numpy()
+    width = max(int(from_end.max()) + 1, min_width)
+    col = width - 1 - from_end
+    
+    close = np.full((len(codes), width), np.nan)
+    volume = np.full((len(codes), width), np.nan)
+    close[row, col] = panel['종가'].to_numpy(np.float64)
+    volume[row, col] = panel['거래량'].to_numpy(np.float64)
+    return codes.tolist(), close, volume
+
+@njit(parallel=True, cache=True)
+def _screen_kernel(close, volume):
+    """
+    종목별 급등주 조건 판정 (numba JIT, 종목 단위 병렬)
+    
+    NaN이 섞인 평균과의 비교가 False가 되는 성질에 의존하므로 fastmath는 사용하지 않습니다.
+    
+    Args:
+        close: panel_to_arrays의 종가 배열 (종목 × 거래일, 열 120개 이상)
+        volume: panel_to_arrays의 거래량 배열
+    
+    Returns:
+        np.ndarray: 종목별 조건 만족 여부 (bool)
+    """
+    n, width = close.shape
+    selected = np.zeros(n, dtype=np.bool_)
+    for i in prange(n):
+        c = close[i]
+        v = volume[i]
         
-        # 60일선이 120일선 위로 올라오는지 확인
-        if df.iloc[-1]['ma60'] <= df.iloc[-1]['ma120']:
-            return None
+        # 최소 100일 이상의 데이터가 필요 (오른쪽 정렬이므로 100일 전 값만 확인)
+        if np.isnan(c[width - 100]):
+            continue
         
-        # 주가가 모든 이동평균선 위에 있는지 확인
-        if df.iloc[-1]['종가'] <= df.iloc[-1]['ma20']:
-            return None
+        # 최근 5일 중 3일 이상 상승
+        up_days = 0
+        for t in range(width - 4, width):
+            if c[t] > c[t - 1]:
+                up_days += 1
+        if up_days < 3:
+            continue
         
-        # 소형주이고 KOSDAQ 종목 위주로 확인
-        if market_cap > 2_000_000_000_000:  # 2조원 이상은 제외
-            return None
+        # 주가가 모든 이동평균선 위에 있는지, 20일선이 60일선 위인지 확인
+        ma20 = c[width - 20:].mean()
+        if not c[width - 1] > ma20:
+            continue
+        ma60 = c[width - 60:].mean()
+        if not ma20 > ma60:
+            continue
         
-        # 최근 5일간 상승 추세 확인
-        price_increase = df.iloc[-5:]['종가'].pct_change().dropna()
-        if not (price_increase > 0).sum() >= 3:  # 최근 5일 중 3일 이상 상승
-            return None
+        # 60일선이 120일선 위로 올라오는지 확인 (120일 미만 종목은 기존처럼 통과)
+        ma120 = c[width - 120:].mean()
+        if ma60 <= ma120:
+            continue
         
-        return code
-    except Exception as e:
-        logger.error(f"종목 처리 중 오류 발생 ({code}): {str(e)}")
-        return None
+        # 최근 5일 중 한 번이라도 거래량이 20일 평균보다 100% 이상 높은 경우
+        for t in range(width - 5, width):
+            if v[t] > v[t - 19:t + 1].mean() * 2.0:
+                selected[i] = True
+                break
+    return selected
+
+def _log_dropped(codes, before, after, reason):
+    """
+    조건에서 탈락한 종목과 조건별 통과 수를 디버그 로그로 남기기
+    
+    Args:
+        codes: 패널 종목코드 배열
+        before: 조건 적용 전 행 번호 배열
+        after: 조건 적용 후 행 번호 배열
+        reason: 조건 설명
+    """
+    # numba가 없어 평소에도 NumPy 단계 계산을 쓰는 경우 탈락 종목 계산 자체를 건너뜀
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    for i in np.setdiff1d(before, after, assume_unique=True):
+        logger.debug("%s 제외: %s 조건 미충족", codes[i], reason)
+    logger.debug("[%s] %d개 중 %d개 통과", reason, len(before), len(after))
+
+def screen_panel(panel):
+    """
+    전 종목 패널에 급등주 조건을 한 번에 적용
+    
+    패널을 종가/거래량 2차원 배열로 바꾼 뒤 전 종목의 조건을 NumPy 연산으로
+    계산하며, 대부분의 종목이 앞 조건에서 걸러지므로 계산이 싼 조건부터 적용합니다.
+    조건에는 마지막 시점의 값만 필요하므로 이동평균은 전체 기간 rolling 대신
+    최근 구간의 평균으로 구합니다. numba가 설치되어 있으면 같은 조건을 종목
+    단위로 병렬 JIT 실행합니다. 디버그 로그가 켜져 있으면 종목별 탈락 사유를
+    남길 수 있도록 조건 단계별 NumPy 계산을 사용합니다.
+    
+    Args:
+        panel: (date, code) MultiIndex OHLCV 패널 (시가총액 조건을 통과한 종목만)
+    
+    Returns:
+        list: 조건을 만족하는 종목코드 리스트
+    """
+    codes, close, volume = panel_to_arrays(panel)
+    
+    if NUMBA_AVAILABLE and not logger.isEnabledFor(logging.DEBUG):
+        selected = _screen_kernel(close, volume)
+        return [code for code, ok in zip(codes, selected) if ok]
+    
+    # numba가 없으면 NumPy로 계산
+    # 조건을 싼 것부터 적용하고 통과한 행만 다음 조건으로 넘김 (NaN 비교는 False라 탈락)
+    # 최소 100일 이상의 데이터가 필요
+    all_idx = np.arange(len(codes))
+    idx = np.flatnonzero(np.count_nonzero(~np.isnan(close[:, -100:]), axis=1) >= 100)
+    _log_dropped(codes, all_idx, idx, "100거래일 이상 데이터")
+    
+    # 최근 5일 중 3일 이상 상승 (등락 4회)
+    prev_idx = idx
+    recent_close = close[idx, -5:]
+    idx = idx[(recent_close[:, 1:] > recent_close[:, :-1]).sum(axis=1) >= 3]
+    _log_dropped(codes, prev_idx, idx, "최근 5일 중 3일 이상 상승")
+    
+    # 주가가 모든 이동평균선 위에 있는지 확인 (데이터가 기간보다 짧으면 평균이 NaN)
+    prev_idx = idx
+    ma20 = close[idx, -20:].mean(axis=1)
+    keep = close[idx, -1] > ma20
+    idx, ma20 = idx[keep], ma20[keep]
+    _log_dropped(codes, prev_idx, idx, "종가 > 20일선")
+    
+    # 최근 골든 크로스 (20일선이 60일선 위로) 확인
+    prev_idx = idx
+    ma60 = close[idx, -60:].mean(axis=1)
+    keep = ma20 > ma60
+    idx, ma60 = idx[keep], ma60[keep]
+    _log_dropped(codes, prev_idx, idx, "20일선 > 60일선")
+    
+    # 60일선이 120일선 위로 올라오는지 확인 (120일 미만 종목은 기존처럼 통과)
+    prev_idx = idx
+    ma120 = close[idx, -120:].mean(axis=1)
+    idx = idx[~(ma60 <= ma120)]
+    _log_dropped(codes, prev_idx, idx, "60일선 > 120일선")
+    
+    # 최근 5일 중 한 번이라도 거래량이 20일 평균보다 100% 이상 높은 경우
+    prev_idx = idx
+    volume_ma20 = np.lib.stride_tricks.sliding_window_view(volume[idx, -24:], 20, axis=1).mean(axis=2)
+    idx = idx[(volume[idx, -5:] > volume_ma20 * 2.0).any(axis=1)]
+    _log_dropped(codes, prev_idx, idx, "최근 5일 내 거래량 20일 평균의 2배 초과")
+    
+    return [codes[i] for i in idx]
 
-def format_stock_message(stock_codes, stock_names):
-    """텔레그램 메시지 포맷팅"""
+def get_price_info(panel, codes):
+    """
+    패널에서 종목별 최근 거래일 시세 추출
+    
+    Args:
+        panel: (date, code) MultiIndex OHLCV 패널
+        codes: 시세를 추출할 종목코드 리스트
+    
+    Returns:
+        dict: {종목코드: {'price': 종가, 'change_rate': 등락률, 'volume': 거래량}}
+    """
+    selected = panel[panel.index.get_level_values('code').isin(codes)]
+    latest = selected.sort_index(level='date').groupby(level='code').tail(1).droplevel('date')
+    return {
+        code: {'price': row['종가'], 'change_rate': row['등락률'], 'volume': row['거래량']}
+        for code, row in latest.iterrows()
+    }
+
+def get_net_purchases(date_str, investor):
+    """
+    투자자별 전 종목 순매수 거래대금 조회
+    
+    Args:
+        date_str: 조회일 (YYYYMMDD)
+        investor: 투자자 구분 (예: 외국인, 기관합계, 연기금)
+    
+    Returns:
+        dict: {종목코드: 순매수거래대금}, 실패 시 빈 딕셔너리
+    """
+    df = safe_stock_api_call(get_market_net_purchases_of_equities, date_str, date_str, "ALL", investor)
+    if df is None or df.empty or '순매수거래대금' not in df.columns:
+        return {}
+    return df['순매수거래대금'].to_dict()
+
+def _format_net_purchase(value):
+    """
+    순매수 거래대금을 메시지용 문자열로 변환
+    
+    Args:
+        value: 순매수 거래대금 (없으면 None)
+    
+    Returns:
+        str: "매수 N원", "매도 N원" 또는 "정보 없음"
+    """
+    if value is None:
+        return "정보 없음"
+    if value > 0:
+        return f"매수 {value:,.0f}원"
+    return f"매도 {abs(value):,.0f}원"
+
+def format_stock_message(stock_codes, stock_names, price_info, net_purchases):
+    """
+    텔레그램 메시지 포맷팅 (미리 수집한 데이터만 사용하며 네트워크 호출 없음)
+    
+    Args:
+        stock_codes: 종목코드 리스트
+        stock_names: 종목명 리스트
+        price_info: get_price_info로 만든 {종목코드: 최근 시세} 딕셔너리
+        net_purchases: {'외국인': {종목코드: 순매수}, '기관': {종목코드: 순매수}}
+    
+    Returns:
+        포맷팅된 메시지
+    """
     if not stock_codes:
         return "오늘의 관심 종목이 없습니다."
     
-    message = "🔍 *오늘의 급등 관심 종목* 🔍\n\n"
+    foreigner_net = net_purchases.get('외국인', {})
+    institution_net = net_purchases.get('기관', {})
+    
+    lines = ["🔍 *오늘의 급등 관심 종목* 🔍", ""]
     
     for code, name in zip(stock_codes, stock_names):
         try:
-            # 당일 시세 정보 가져오기
-            ohlcv = safe_stock_api_call(
-                stock.get_market_ohlcv_by_date,
-                end_date.strftime('%Y%m%d'),
-                end_date.strftime('%Y%m%d'),
-                code
-            )
-            
-            if ohlcv is None or ohlcv.empty:
+            # 패널에서 추출한 최근 시세 사용
+            info = price_info.get(code)
+            if info is None:
                 continue
-                
-            current_price = ohlcv.iloc[-1]['종가']
-            change_rate = ohlcv.iloc[-1]['등락률']
-            volume = ohlcv.iloc[-1]['거래량']
-            
-            # 외국인 매매 동향
-            foreigner = safe_stock_api_call(
-                stock.get_market_trading_value_by_date,
-                end_date.strftime('%Y%m%d'),
-                end_date.strftime('%Y%m%d'),
-                code
-            )
-            
-            foreigner_status = "정보 없음"
-            if foreigner is not None and not foreigner.empty and '외국인순매수' in foreigner.columns:
-                foreigner_buy = foreigner.iloc[-1]['외국인순매수']
-                if foreigner_buy > 0:
-                    foreigner_status = f"매수 {foreigner_buy:,.0f}원"
-                else:
-                    foreigner_status = f"매도 {abs(foreigner_buy):,.0f}원"
             
-            # 기관 매매 동향
-            institution = safe_stock_api_call(
-                stock.get_market_trading_value_by_date,
-                end_date.strftime('%Y%m%d'),
-                end_date.strftime('%Y%m%d'),
-                code
-            )
-            
-            institution_status = "정보 없음"
-            if institution is not None and not institution.empty and '기관순매수' in institution.columns:
-                institution_buy = institution.iloc[-1]['기관순매수']
-                if institution_buy > 0:
-                    institution_status = f"매수 {institution_buy:,.0f}원"
-                else:
-                    institution_status = f"매도 {abs(institution_buy):,.0f}원"
-            
-            message += f"*{name}* ({code})\n"
-            message += f"현재가: {current_price:,}원 ({change_rate:+.2f}%)\n"
-            message += f"거래량: {volume:,}\n"
-            message += f"외국인: {foreigner_status}\n"
-            message += f"기관: {institution_status}\n\n"
+            lines += [
+                f"*{name}* ({code})",
+                f"현재가: {info['price']:,}원 ({info['change_rate']:+.2f}%)",
+                f"거래량: {info['volume']:,}",
+                f"외국인: {_format_net_purchase(foreigner_net.get(code))}",
+                f"기관: {_format_net_purchase(institution_net.get(code))}",
+                "",
+            ]
             
         except Exception as e:
             logger.error(f"메시지 포맷팅 중 오류 ({code}): {str(e)}")
-            message += f"*{name}* ({code}) - 상세 정보 로딩 중 오류 발생\n\n"
+            lines += [f"*{name}* ({code}) - 상세 정보 로딩 중 오류 발생", ""]
     
-    message += "주의: 과거의 급등 패턴을 기반으로 분석한 종목으로, 투자 결정은 본인의 책임 하에 신중하게 진행하세요."
+    lines.append("주의: 과거의 급등 패턴을 기반으로 분석한 종목으로, 투자 결정은 본인의 책임 하에 신중하게 진행하세요.")
     
-    return message
+    return "\n".join(lines)
 
-def save_to_database(stock_codes, stock_names):
-    """분석 결과를 Supabase에 저장"""
+def save_to_database(stock_codes, stock_names, price_info, kosdaq_codes):
+    """
+    분석 결과를 Supabase에 저장 (코스닥 종목은 kosdaq_stocks, 나머지는 kospi_stocks)
+    
+    Args:
+        stock_codes: 종목코드 리스트
+        stock_names: 종목명 리스트
+        price_info: get_price_info로 만든 {종목코드: 최근 시세} 딕셔너리
+        kosdaq_codes: 코스닥 종목코드 집합
+    
+    Returns:
+        성공 여부 (bool)
+    """
     try:
         if not stock_codes:
             logger.info("저장할 데이터가 없습니다.")
             return True
         
-        today = datetime.now().strftime('%Y-%m-%d')
+        if not price_info:
+            logger.warning("저장할 시세 정보가 없습니다.")
+            return False
         
-        stock_data = []
-        for code, name in zip(stock_codes, stock_names):
-            try:
-                # 당일 시세 정보 가져오기
-                ohlcv = safe_stock_api_call(
-                    stock.get_market_ohlcv_by_date,
-                    end_date.strftime('%Y%m%d'),
-                    end_date.strftime('%Y%m%d'),
-                    code
-                )
-                
-                if ohlcv is None or ohlcv.empty:
-                    continue
-                    
-                current_price = ohlcv.iloc[-1]['종가']
-                change_rate = ohlcv.iloc[-1]['등락률']
-                
-                stock_data.append({
-                    'date': today,
-                    'code': code,
-                    'name': name,
-                    'price': float(current_price),
-                    'change_rate': float(change_rate)
-                })
-                
-            except Exception as e:
-                logger.error(f"데이터베이스 저장 준비 중 오류 ({code}): {str(e)}")
+        # 종목 목록과 패널 시세를 열 단위로 결합하고 Supabase 호출 직전에만 행으로 변환
+        # (시세가 없는 종목은 inner join으로 제외)
+        df = pd.DataFrame({'code': stock_codes, 'name': stock_names})
+        prices = pd.DataFrame.from_dict(price_info, orient='index')[['price', 'change_rate']]
+        df = df.join(prices.astype(np.float64), on='code', how='inner')
+        df.insert(0, 'date', datetime.now().strftime('%Y-%m-%d'))
         
-        # Supabase에 저장
-        market_type = ""
-        for code in stock_codes:
-            if stock.get_market_ticker_name(code).endswith('KOSPI'):
-                market_type = "kospi_stocks"
-                break
-            elif stock.get_market_ticker_name(code).endswith('KOSDAQ'):
-                market_type = "kosdaq_stocks"
-                break
+        # Supabase에 저장 (종목명 조회 대신 시장별 종목 집합으로 구분)
+        is_kosdaq = df['code'].isin(kosdaq_codes)
+        kospi_data = df[~is_kosdaq].to_dict('records')
+        kosdaq_data = df[is_kosdaq].to_dict('records')
         
-        # 기본값 설정
-        if not market_type:
-            market_type = "kospi_stocks" 
-            
-        result = save_stock_data(stock_data, market_type)
+        result = True
+        if kospi_data:
+            result = save_stock_data(kospi_data, "kospi_stocks") and result
+        if kosdaq_data:
+            result = save_stock_data(kosdaq_data, "kosdaq_stocks") and result
         return result
         
     except Exception as e:
@@ -372,13 +513,11 @@ def save_to_database(stock_codes, stock_names):
 
 def run_analysis():
     """급등주 분석 실행"""
-    global start_date, end_date
-    
     logger.info("급등주 분석 시작...")
 
     try:
         end_date = datetime.now()
-        start_date = end_date - timedelta(days=365)
+        start_date = end_date - timedelta(days=LOOKBACK_DAYS)
 
         logger.info("주식 데이터 수집 중...")
         
@@ -401,7 +540,7 @@ def run_analysis():
         
         for attempt in range(max_retries):
             logger.info(f"주식 목록 가져오기 시도 중... ({attempt+1}/{max_retries})")
-            all_stocks = safe_stock_api_call(stock.get_market_ticker_list, date=end_date_str)
+            all_stocks = safe_stock_api_call(get_market_ticker_list, date=end_date_str)
             
             if all_stocks and len(all_stocks) > 100:  # 정상적으로 100개 이상의 종목이 있어야 함
                 logger.info(f"주식 목록 가져오기 성공: {len(all_stocks)}개 종목")
@@ -418,81 +557,95 @@ def run_analysis():
 
         # 우선주 및 스팩주 제외 - 로깅 추가
         filtered_stocks = []
+        code_to_name = {}
         logger.info("우선주 및 스팩주 필터링 중...")
         
-        # 종목 수가 많은 경우 진행 상황 표시
-        for i, code in enumerate(all_stocks):
-            if i % 100 == 0:
-                logger.info(f"종목 필터링 진행 중... ({i}/{len(all_stocks)})")
-                
-            try:
-                name = safe_stock_api_call(stock.get_market_ticker_name, code)
-                if name and not code.endswith(('5', '7', '9')) and '우' not in name and '스팩' not in name and not code.startswith('43'):
-                    filtered_stocks.append(code)
-            except Exception as e:
-                logger.warning(f"종목명 가져오기 실패 ({code}): {str(e)}")
-                continue
+        # 종목코드만으로 판단 가능한 조건을 먼저 적용해 종목명 조회 수를 줄임
+        candidates = [
+            code for code in all_stocks
+            if not code.endswith(EXCLUDED_CODE_SUFFIXES) and not code.startswith(EXCLUDED_CODE_PREFIXES)
+        ]
+        
+        # 전 종목 이름을 한 번에 조회하고, 빠진 종목만 종목별로 조회
+        # (종목별 조회는 네트워크 대기가 대부분이므로 스레드로 동시에 요청)
+        all_names = get_ticker_names(end_date_str)
+        missing = [code for code in candidates if code not in all_names]
+        if missing:
+            logger.info(f"종목명 개별 조회: {len(missing)}개 종목")
+            with ThreadPoolExecutor(max_workers=KRX_MAX_WORKERS) as executor:
+                all_names.update(zip(missing, executor.map(_ticker_name_or_none, missing)))
+        
+        for code in candidates:
+            name = all_names.get(code)
+            if name and not EXCLUDED_NAME_PATTERN.search(name):
+                filtered_stocks.append(code)
+                code_to_name[code] = name
 
         logger.info(f"종목 필터링 완료: {len(filtered_stocks)}개 종목 (우선주 및 스팩주 제외)")
         
-        # 시가총액 가져오기 - 진행 상황 로깅 추가
-        marcap_dict = {}
+        # 시가총액은 전 종목 스냅샷을 한 번에 조회
         logger.info("시가총액 데이터 수집 중...")
+        marcap_dict = {}
+        cap_df = safe_stock_api_call(get_market_cap_by_ticker, end_date_str, market="ALL")
+        if cap_df is not None and not cap_df.empty:
+            marcap_dict = cap_df['시가총액'].to_dict()
+        else:
+            logger.warning("시가총액 데이터를 가져오지 못했습니다. 시가총액 조건 없이 진행합니다.")
         
-        for i, code in enumerate(filtered_stocks):
-            if i % 100 == 0:
-                logger.info(f"시가총액 데이터 수집 중... ({i}/{len(filtered_stocks)})")
-                
-            try:
-                marcap = safe_stock_api_call(
-                    stock.get_market_cap_by_date, 
-                    end_date.strftime('%Y%m%d'),
-                    end_date.strftime('%Y%m%d'),
-                    code
-                )
-                
-                if marcap is not None and not marcap.empty:
-                    marcap_dict[code] = marcap['시가총액'].iloc[-1]
-            except Exception as e:
-                logger.error(f"시가총액 가져오기 실패 ({code}): {str(e)}")
-                
-            # 너무 빠르게 요청하지 않도록 약간의 딜레이 추가
-            if i % 20 == 0:
-                time.sleep(1)  # 20개 종목마다 1초 대기
-
-        small_caps = [(code, marcap_dict.get(code, 0)) for code in filtered_stocks]
-        logger.info(f"분석 대상 종목: {len(small_caps)}개")
-
-        # 종목명 사전 생성
-        code_to_name = {}
-        for code in filtered_stocks:
-            name = safe_stock_api_call(stock.get_market_ticker_name, code)
-            if name:
-                code_to_name[code] = name
+        # 대형주는 OHLCV 분석 전에 제외 (소형주 위주로 확인)
+        small_caps = [code for code in filtered_stocks if marcap_dict.get(code, 0) <= MAX_MARKET_CAP]
+        logger.info(f"시가총액 필터링 완료: {len(small_caps)}개 종목")
+
+        # 전 종목 OHLCV를 영업일 단위로 한 번에 수집
+        logger.info("전 종목 OHLCV 패널 수집 중...")
+        panel = fetch_panel(start_date, end_date)
+        if panel is None:
+            error_msg = "OHLCV 데이터를 가져오는 데 실패했습니다."
+            logger.error(error_msg)
+            send_telegram_message(f"급등주 분석 중 오류 발생: {error_msg}", is_kospi=True)
+            return [], []
+        
+        panel_days = panel.index.get_level_values('date').nunique()
+        if panel_days < MIN_PANEL_DAYS:
+            logger.warning(f"수집된 거래일이 {panel_days}일로 이동평균 계산에 필요한 {MIN_PANEL_DAYS}일보다 적습니다.")
+        
+        panel = panel[panel.index.get_level_values('code').isin(small_caps)]
+        logger.info(f"분석 대상 종목: {panel.index.get_level_values('code').nunique()}개")
 
         logger.info("종목 분석 시작...")
         
-        # 멀티프로세싱 풀 생성
-        processes = min(cpu_count(), 4)  # CPU 코어 수와 4 중 작은 값 사용
-        with Pool(processes) as p:
-            results = list(tqdm(p.imap(process_stock, small_caps), total=len(small_caps)))
-
-        # 결과 필터링
-        selected_stocks = [code for code in results if code]
+        # 전 종목 조건을 한 번에 계산
+        selected_stocks = set(screen_panel(panel))
+        # 패널은 종목코드 정렬 순서이므로 결과는 종목 목록 순서로 되돌림
+        selected_stocks = [code for code in all_stocks if code in selected_stocks]
+        # 저장과 메시지에 쓸 시세는 이미 받은 패널에서 한 번만 추출
+        price_info = get_price_info(panel, selected_stocks)
+        del panel
+        
+        # 메시지에 쓸 외국인/기관 순매수는 종목별이 아닌 투자자별로 한 번씩만 조회
+        net_purchases = {}
+        if selected_stocks:
+            net_purchases = {
+                '외국인': get_net_purchases(end_date_str, "외국인"),
+                '기관': get_net_purchases(end_date_str, "기관합계"),
+            }
+
+        # 결과 정리
         selected_names = [code_to_name.get(code, "Unknown") for code in selected_stocks]
 
         logger.info(f"분석 완료: {len(selected_names)}개 종목 발견")
 
         # Supabase에 저장
         logger.info("데이터베이스 저장 중...")
-        save_result = save_to_database(selected_stocks, selected_names)
+        kosdaq_codes = set(safe_stock_api_call(get_market_ticker_list, date=end_date_str, market="KOSDAQ") or [])
+        save_result = save_to_database(selected_stocks, selected_names, price_info, kosdaq_codes)
         if save_result:
             logger.info("데이터베이스 저장 완료")
         else:
             logger.warning("데이터베이스 저장 실패")
 
         # 텔레그램 전송 (코스피/코스닥 봇으로 전송)
-        message = format_stock_message(selected_stocks, selected_names)
+        message = format_stock_message(selected_stocks, selected_names, price_info, net_purchases)
         send_telegram_message(message, is_kospi=True)
         logger.info("텔레그램 메시지 전송 완료")
 
@@ -504,13 +657,6 @@ def run_analysis():
         send_telegram_message(f"급등주 분석 중 오류 발생: {str(e)}", is_kospi=True)
         return [], []
 
-def should_run():
-    """실행 시간 확인"""
-    kr_tz = pytz.timezone('Asia/Seoul')
-    now = datetime.now(kr_tz)
-    target_time = KOSPI_EXECUTION_TIME.split(':')
-    return now.hour == int(target_time[0]) and now.minute == int(target_time[1])
-
 def main():
     """메인 함수"""
     print("급등주 포착 프로그램 시작")
@@ -520,16 +666,13 @@ def main():
     # run_analysis()
     
     while True:
-        kr_time = datetime.now(pytz.timezone('Asia/Seoul'))
-
-        if should_run() and kr_time.weekday() < 5:  # 평일에만 실행
-            print(f"\n실행 시작: {kr_time}")
-            run_analysis()
-            # 실행 후 1분 대기 (같은 시간에 중복 실행 방지)
-            time.sleep(60)
+        # 30초마다 확인하지 않고 다음 평일 실행 시각까지 대기
+        next_run = next_run_time(TARGET_H, TARGET_M, KR_TZ)
+        print(f"다음 실행 예정: {next_run.strftime('%Y-%m-%d %H:%M:%S')} 대기 중...")
+        time.sleep(seconds_until(TARGET_H, TARGET_M, KR_TZ))
 
-        print(f"현재 시간: {kr_time.strftime('%Y-%m-%d %H:%M:%S')} 대기 중...")
-        time.sleep(30)  # 30초마다 확인
+        print(f"\n실행 시작: {datetime.now(KR_TZ)}")
+        run_analysis()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -7,8 +7,12 @@ import os
 import logging
 import traceback
 import time
+import hashlib
+import requests
 
+from utils.file_cache import cached
 from utils.telegram_service import send_telegram_message, send_telegram_image
+from utils.scheduling import seconds_until
 from config.config import TQQQ_EXECUTION_TIME
 
 # 로깅 설정
@@ -29,6 +33,23 @@ console_handler.setFormatter(formatter)
 logger.addHandler(file_handler)
 logger.addHandler(console_handler)
 
+# yfinance 요청 간 HTTP(TLS) 연결 재사용
+yf_session = requests.Session()
+
+@cached(ttl=timedelta(hours=1))
+def fetch_history(ticker, period):
+    """
+    yfinance 시세 조회 (같은 날 재실행 시 네트워크 없이 재사용하도록 1시간 파일 캐시)
+    
+    Args:
+        ticker (str): 주식 티커 심볼
+        period (str): 데이터 기간
+        
+    Returns:
+        DataFrame: 주식 데이터
+    """
+    return yf.Ticker(ticker, session=yf_session).history(period=period)
+
 def safe_data_fetch(ticker, period="1y", interval="1d", retries=3, delay=2):
     """
     yfinance에서 안전하게 데이터를 가져오는 함수
@@ -67,8 +88,8 @@ def get_tqqq_data():
         pandas DataFrame: TQQQ 주가 데이터
     """
     try:
-        tqqq = yf.Ticker("TQQQ")
-        hist = tqqq.history(period="1y")  # 최근 1년 데이터
+        # 차트에 최근 100일의 200일선을 그리므로 1년치 유지
+        hist = fetch_history("TQQQ", "1y")  # 최근 1년 데이터
         
         if hist.empty:
             logger.error("TQQQ 데이터를 가져오는데 실패했습니다.")
@@ -95,17 +116,20 @@ def analyze_tqqq():
     if tqqq_data is None:
         return None
     
-    # 200일 이동평균 계산
-    tqqq_data['MA200'] = tqqq_data['Close'].rolling(window=200).mean()
+    # 200일 이동평균 계산 (차트용 전체 구간은 합성곱으로 한 번에 계산)
+    close = tqqq_data['Close'].to_numpy(dtype=np.float64)
+    ma200_series = np.full(len(close), np.nan)
+    if len(close) >= 200:
+        ma200_series[199:] = np.convolve(close, np.ones(200) / 200, mode='valid')
+    tqqq_data['MA200'] = ma200_series
     
     # 10% 엔벨로프 계산 (MA200 + 10%)
-    tqqq_data['Envelope'] = tqqq_data['MA200'] * 1.10
+    tqqq_data['Envelope'] = ma200_series * 1.10
     
-    # 최근 데이터
-    latest = tqqq_data.iloc[-1]
-    close_price = latest['Close']
-    ma200 = latest['MA200']
-    envelope = latest['Envelope']
+    # 최근 데이터 (판단에는 마지막 값만 필요)
+    close_price = close[-1]
+    ma200 = ma200_series[-1]
+    envelope = ma200 * 1.10
     
     # 추천 계산
     if close_price < ma200:
@@ -135,6 +159,25 @@ def generate_tqqq_chart(tqqq_data):
         tqqq_data: TQQQ 주가 데이터 (DataFrame)
     """
     try:
+        chart_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
+        meta_path = os.path.join(chart_dir, 'tqqq_chart.meta')
+        
+        # 차트 제목과 파일명은 실행일이 아니라 마지막 봉의 날짜 기준
+        # (재사용한 차트도 제목의 날짜가 데이터와 일치)
+        bar_date = tqqq_data.index[-1].strftime('%Y-%m-%d')
+        chart_path = os.path.join(chart_dir, f'tqqq_chart_{bar_date}.png')
+        
+        # 마지막 봉이 이전 실행과 같으면 (주말, 휴일, 재실행) 기존 차트 재사용
+        chart_key = hashlib.md5(
+            f"{tqqq_data.index[-1].isoformat()}:{float(tqqq_data['Close'].iloc[-1])}".encode('utf-8')
+        ).hexdigest()[:16]
+        if os.path.exists(meta_path):
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                prev_key, _, prev_path = f.read().strip().partition('\n')
+            if prev_key == chart_key and prev_path == chart_path and os.path.exists(prev_path):
+                logger.info(f"마지막 봉이 같아 기존 TQQQ 차트 재사용: {prev_path}")
+                return prev_path
+        
         plt.figure(figsize=(12, 6))
         
         # 종가, 200일 이동평균, 엔벨로프 그래프
@@ -142,9 +185,8 @@ def generate_tqqq_chart(tqqq_data):
         plt.plot(tqqq_data.index[-100:], tqqq_data['MA200'][-100:], label='200일 이동평균', color='red')
         plt.plot(tqqq_data.index[-100:], tqqq_data['Envelope'][-100:], label='엔벨로프 (MA200 + 10%)', color='green', linestyle='--')
         
-        # 현재 날짜 추가
-        current_date = datetime.now().strftime('%Y-%m-%d')
-        plt.title(f'TQQQ 200일 이동평균 및 10% 엔벨로프 ({current_date})')
+        # 마지막 봉 날짜 추가
+        plt.title(f'TQQQ 200일 이동평균 및 10% 엔벨로프 ({bar_date})')
         plt.xlabel('날짜')
         plt.ylabel('가격 ($)')
         plt.legend()
@@ -161,12 +203,13 @@ def generate_tqqq_chart(tqqq_data):
         plt.figtext(0.02, 0.89, f'엔벨로프: ${envelope:.2f}', fontsize=9)
         
         # 차트 저장
-        chart_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
         os.makedirs(chart_dir, exist_ok=True)
-        chart_path = os.path.join(chart_dir, f'tqqq_chart_{current_date}.png')
         plt.savefig(chart_path)
         plt.close()
         
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            f.write(f"{chart_key}\n{chart_path}")
+        
         logger.info(f"TQQQ 차트 생성 완료: {chart_path}")
         return chart_path
     except Exception as e:
@@ -187,23 +230,25 @@ def format_tqqq_message(result):
         return "TQQQ 데이터를 가져오는데 실패했습니다."
     
     current_date = datetime.now().strftime('%Y-%m-%d')
-    message = f"📊 *TQQQ 200일선 분석* 📊\n({current_date})\n\n"
-    message += f"TQQQ 종가: ${result['close_price']:.2f}\n"
-    message += f"200일선: ${result['ma200']:.2f}\n"
-    message += f"10%엔벨로프선: ${result['envelope']:.2f}\n"
-    message += f"차이: ${result['diff']:.2f} ({(result['diff']/result['ma200']*100):.2f}%)\n\n"
+    lines = [
+        "📊 *TQQQ 200일선 분석* 📊",
+        f"({current_date})",
+        "",
+        f"TQQQ 종가: ${result['close_price']:.2f}",
+        f"200일선: ${result['ma200']:.2f}",
+        f"10%엔벨로프선: ${result['envelope']:.2f}",
+        f"차이: ${result['diff']:.2f} ({(result['diff']/result['ma200']*100):.2f}%)",
+        "",
+    ]
     
     if result['recommendation'] == "SGOV":
-        message += "⚠️ *현재 상태*: 200일선 아래\n"
-        message += "💡 *추천*: SGOV (단기 국채 ETF) 구매"
+        lines += ["⚠️ *현재 상태*: 200일선 아래", "💡 *추천*: SGOV (단기 국채 ETF) 구매"]
     elif result['recommendation'] == "TQQQ":
-        message += "✅ *현재 상태*: 200일선 위, 엔벨로프 아래\n"
-        message += "💡 *추천*: TQQQ (3배 나스닥 ETF) 구매"
+        lines += ["✅ *현재 상태*: 200일선 위, 엔벨로프 아래", "💡 *추천*: TQQQ (3배 나스닥 ETF) 구매"]
     else:
-        message += "🔥 *현재 상태*: 엔벨로프 위\n"
-        message += "💡 *추천*: SPLG (S&P 500 ETF) 구매"
+        lines += ["🔥 *현재 상태*: 엔벨로프 위", "💡 *추천*: SPLG (S&P 500 ETF) 구매"]
     
-    return message
+    return "\n".join(lines)
 
 def send_tqqq_alert():
     """TQQQ 알림 전송"""
@@ -237,12 +282,6 @@ def send_tqqq_alert():
         logger.error(f"TQQQ 알림 오류: {str(e)}\n{error_traceback}")
         send_telegram_message(f"TQQQ 알림 오류: {str(e)}")
 
-def should_run():
-    """실행 시간 확인"""
-    now = datetime.now()
-    target_time = TQQQ_EXECUTION_TIME.split(':')
-    return now.hour == int(target_time[0]) and now.minute == int(target_time[1])
-
 def main():
     """메인 함수"""
     print(f"TQQQ 분석 시작 (실행 예정 시간: {TQQQ_EXECUTION_TIME})")
@@ -250,13 +289,11 @@ def main():
     # 개발 중에는 바로 실행 (주석 해제)
     # send_tqqq_alert()
     
+    target_hour, target_minute = map(int, TQQQ_EXECUTION_TIME.split(':'))
     while True:
-        if should_run() and datetime.now().weekday() < 5:  # 평일에만 실행
-            send_tqqq_alert()
-            # 실행 후 1분 대기 (같은 시간에 중복 실행 방지)
-            time.sleep(60)
-        
-        time.sleep(30)  # 30초마다 확인
+        # 30초마다 확인하지 않고 다음 평일 실행 시각까지 대기
+        time.sleep(seconds_until(target_hour, target_minute))
+        send_tqqq_alert()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
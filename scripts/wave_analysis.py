@@ -2,19 +2,23 @@ import pandas as pd
 import numpy as np
 from pykrx import stock
 from datetime import datetime, timedelta
-from collections import Counter
+from functools import lru_cache
 from tqdm import tqdm
-from multiprocessing import Pool, cpu_count
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import re
 import time
-import pytz
-import os
+import sys
 import logging
 import traceback
 import requests
 
 from utils.telegram_service import send_telegram_message
 from utils.database import save_stock_data
-from config.config import KOSPI_EXECUTION_TIME
+from utils.file_cache import cached
+from utils import ohlcv_cache
+from utils.jit import njit
+from utils.krx_session import install_krx_session
+from config.config import KRX_MAX_WORKERS, WAVE_MAX_RESULTS
 
 # 로깅 설정
 logger = logging.getLogger(__name__)
@@ -34,9 +38,31 @@ console_handler.setFormatter(formatter)
 logger.addHandler(file_handler)
 logger.addHandler(console_handler)
 
+# 분석 제외 종목 조건 (우선주 및 스팩주 등)
+EXCLUDED_CODE_SUFFIXES = ('5', '7', '9')
+EXCLUDED_CODE_PREFIXES = ('43',)
+EXCLUDED_NAME_PATTERN = re.compile('우|스팩')
+
+# 피보나치 되돌림 수준 (0.0 → 1.0 순서)
+FIB_LEVEL_NAMES = ("0.0", "0.236", "0.382", "0.5", "0.618", "0.786", "1.0")
+FIB_RATIOS = np.array([0.0, 0.236, 0.382, 0.5, 0.618, 0.786, 1.0])
+
 # 글로벌 변수
-start_date = None
-end_date = None
+code_to_name = {}
+
+# pykrx 요청이 스레드 간에 TCP 연결을 재사용하도록 세션 교체
+install_krx_session(KRX_MAX_WORKERS)
+
+# pykrx 조회 결과 디스크 캐시 - 실패 후 재실행이나 같은 날 재실행 시 다시 받지 않음
+# (확정된 지난 기간 조회는 1년, 조회일 당일에 받은 결과는 12시간 유지)
+# KRX 조회 실패로 비어 있거나 일부만 받은 종목 목록은 캐시하지 않음 (다음 실행에서 재시도)
+get_market_ticker_list = cached(validate=lambda tickers: len(tickers) > 100)(stock.get_market_ticker_list)
+get_market_cap_by_ticker = cached()(stock.get_market_cap_by_ticker)
+get_market_price_change_by_ticker = cached()(stock.get_market_price_change_by_ticker)
+# 종목명은 날짜 인자가 없으므로 일주일만 유지
+get_market_ticker_name = cached(ttl=timedelta(days=7))(stock.get_market_ticker_name)
+# 종목별 일봉(get_market_ohlcv_by_date)은 종료일이 매일 바뀌어 캐시 파일이 계속 쌓이므로
+# 여기서 감싸지 않고 utils.ohlcv_cache에 종목별로 이어 붙여 보관
 
 def safe_stock_api_call(func, *args, retries=5, delay=3, **kwargs):
     """
@@ -87,18 +113,195 @@ def safe_stock_api_call(func, *args, retries=5, delay=3, **kwargs):
     logger.error(f"최대 재시도 횟수 초과 ({func.__name__}): 데이터를 가져올 수 없습니다")
     return None
 
-def process_stock(stock_info):
+@lru_cache(maxsize=4096)
+def _ticker_name(code):
+    """
+    종목명 조회 (한 번의 실행 안에서는 종목명이 바뀌지 않으므로 메모리에 보관)
+    
+    Args:
+        code: 종목코드
+    
+    Returns:
+        종목명 또는 실패 시 None
+    """
+    return safe_stock_api_call(get_market_ticker_name, code)
+
+def _ticker_name_or_none(code):
+    """
+    종목명 조회 (스레드 풀에서 사용, 예외 발생 시 None)
+    
+    Args:
+        code: 종목코드
+    
+    Returns:
+        종목명 또는 실패 시 None
+    """
+    try:
+        return _ticker_name(code)
+    except Exception as e:
+        logger.warning(f"종목명 가져오기 실패 ({code}): {str(e)}")
+        return None
+
+def get_ticker_names(date_str):
+    """
+    전 종목 종목명을 한 번의 조회로 가져오기
+    
+    Args:
+        date_str: 조회일 (YYYYMMDD)
+    
+    Returns:
+        dict: {종목코드: 종목명}, 실패 시 빈 딕셔너리
+    """
+    df = safe_stock_api_call(get_market_price_change_by_ticker, date_str, date_str, market="ALL")
+    if df is None or df.empty or '종목명' not in df.columns:
+        logger.warning("전 종목 종목명 조회 실패, 종목별로 조회합니다.")
+        return {}
+    return df['종목명'].to_dict()
+
+@njit(cache=True, nogil=True)
+def _wave_indicators(close):
+    """
+    마지막 봉 기준 볼린저 밴드, RSI, MACD를 한 번에 계산 (numba JIT)
+    
+    pandas rolling/ewm을 지표마다 따로 돌리지 않고 종가 배열을 한 번 순회하며
+    지수평균을 갱신합니다. GIL을 놓고 실행되므로 스레드 풀의 다른 종목 조회와 겹쳐 실행됩니다.
+    - 볼린저 밴드: 최근 20봉 평균 ± 2 × 표본표준편차
+    - RSI: 14봉 Wilder 평활 (첫 14개 등락의 단순평균으로 시작), 평균 하락폭이 0이면 NaN
+    - MACD: ewm(span=12) - ewm(span=26), 시그널 ewm(span=9) (adjust=False)
+    
+    Args:
+        close: 종가 배열 (float64, 26봉 이상)
+    
+    Returns:
+        tuple: (볼린저 상단, 볼린저 하단, RSI, MACD, 직전 MACD, 시그널, 직전 시그널)
+    """
+    n = len(close)
+    
+    # 볼린저 밴드
+    window = close[n - 20:]
+    bol_mid = window.mean()
+    bol_std = np.sqrt(((window - bol_mid) ** 2).sum() / 19)
+    
+    # RSI (첫 14개 등락의 평균으로 초기화 후 Wilder 평활)
+    avg_gain = 0.0
+    avg_loss = 0.0
+    for t in range(1, 15):
+        diff = close[t] - close[t - 1]
+        avg_gain += max(diff, 0.0) / 14
+        avg_loss += max(-diff, 0.0) / 14
+    for t in range(15, n):
+        diff = close[t] - close[t - 1]
+        avg_gain = avg_gain * (13 / 14) + max(diff, 0.0) / 14
+        avg_loss = avg_loss * (13 / 14) + max(-diff, 0.0) / 14
+    rsi = np.nan if avg_loss == 0 else 100 - 100 / (1 + avg_gain / avg_loss)
+    
+    # MACD
+    fast = close[0]
+    slow = close[0]
+    signal = 0.0
+    macd = 0.0
+    macd_prev = np.nan
+    signal_prev = np.nan
+    for t in range(n):
+        if t > 0:
+            fast = fast * (11 / 13) + close[t] * (2 / 13)
+            slow = slow * (25 / 27) + close[t] * (2 / 27)
+        macd = fast - slow
+        signal = macd if t == 0 else signal * (8 / 10) + macd * (2 / 10)
+        if t == n - 2:
+            macd_prev = macd
+            signal_prev = signal
+    
+    return bol_mid + 2 * bol_std, bol_mid - 2 * bol_std, rsi, macd, macd_prev, signal, signal_prev
+
+def _resample_weekly(daily):
+    """
+    일봉을 주봉(월~일, 일요일 라벨)으로 묶기
+    
+    resample('W').agg(...)와 같은 결과를 내지만 종목마다 리샘플러와 그룹 객체를
+    만들지 않도록 주 번호 경계에서 numpy reduceat으로 집계합니다.
+    거래가 없는 주(연휴 등)는 행이 생기지 않습니다.
+    
+    Args:
+        daily: 날짜 오름차순 일봉 DataFrame (비어 있지 않아야 함)
+    
+    Returns:
+        주봉 DataFrame (시가, 고가, 저가, 종가, 거래량)
+    """
+    # 1970-01-01(목요일) 기준 일수에 3을 더하면 월요일마다 주 번호가 바뀜
+    days = daily.index.to_numpy(dtype='datetime64[D]').astype(np.int64)
+    week = (days + 3) // 7
+    starts = np.flatnonzero(np.diff(week, prepend=week[0] - 1))
+    ends = np.append(starts[1:], len(week)) - 1
+    # 라벨은 해당 주의 일요일
+    sundays = (week[starts] * 7 + 3).astype('datetime64[D]').astype(daily.index.dtype)
+    
+    return pd.DataFrame({
+        '시가': daily['시가'].to_numpy()[starts],
+        '고가': np.maximum.reduceat(daily['고가'].to_numpy(), starts),
+        '저가': np.minimum.reduceat(daily['저가'].to_numpy(), starts),
+        '종가': daily['종가'].to_numpy()[ends],
+        '거래량': np.add.reduceat(daily['거래량'].to_numpy(), starts),
+    }, index=pd.DatetimeIndex(sundays, name=daily.index.name))
+
+def get_weekly_data(code, start_date_str, end_date_str):
+    """
+    주봉 데이터 조회
+    
+    pykrx는 주봉(freq='w')을 지원하지 않으므로 수정주가 일봉을 받아 주 단위로 묶습니다.
+    일봉은 종목별로 디스크에 보관하고 다음 실행부터는 마지막 캐시일 이후만 받습니다.
+    캐시가 조회 시작일부터의 기록인지는 저장 당시 요청한 시작일로 판단하므로
+    조회 기간 중에 상장한 종목도 매번 전체를 다시 받지 않습니다.
+    마지막 캐시일의 종가가 달라졌다면 (액면분할 등으로 수정주가가 바뀐 경우) 전체를 다시 받습니다.
+    
+    Args:
+        code: 종목코드
+        start_date_str: 조회 시작일 (YYYYMMDD)
+        end_date_str: 조회 종료일 (YYYYMMDD)
+    
+    Returns:
+        (일봉 DataFrame, 주봉 DataFrame) 튜플 또는 실패 시 None
+        주봉은 시가, 고가, 저가, 종가, 거래량 컬럼을 가집니다.
+    """
+    start = pd.Timestamp(start_date_str)
+    daily = None
+    
+    cache_entry = ohlcv_cache.load(code)
+    if cache_entry is not None and cache_entry[1] <= start:
+        cached_daily = cache_entry[0]
+        last_date = cached_daily.index[-1]
+        # 마지막 캐시일(장중에 받은 값일 수 있음)부터 다시 받아 이어 붙임
+        tail = safe_stock_api_call(
+            stock.get_market_ohlcv_by_date, last_date.strftime('%Y%m%d'), end_date_str, code, adjusted=True
+        )
+        if tail is not None and not tail.empty and tail.index[0] == last_date \
+                and tail['종가'].iloc[0] == cached_daily['종가'].iloc[-1]:
+            daily = pd.concat([cached_daily.iloc[:-1], tail])
+    
+    if daily is None:
+        daily = safe_stock_api_call(stock.get_market_ohlcv_by_date, start_date_str, end_date_str, code, adjusted=True)
+        if daily is None or daily.empty:
+            return None
+    
+    daily = daily[daily.index >= start]
+    if daily.empty:
+        return None
+    ohlcv_cache.save(code, daily, history_start=start)
+    
+    return daily, _resample_weekly(daily).astype(np.int64)
+
+def process_stock(stock_info, start_date, end_date):
     """
     파동주 분석 - 피보나치 되돌림 수준을 통해 파동 패턴 분석
     
     Args:
         stock_info: (종목코드, 시가총액) 튜플
+        start_date: 조회 시작일 (datetime)
+        end_date: 조회 종료일 (datetime)
     
     Returns:
         분석 결과 딕셔너리 또는 None
     """
-    global start_date, end_date
-    
     try:
         code, market_cap = stock_info
         
@@ -116,53 +319,44 @@ def process_stock(stock_info):
             return None
         
         # 최소 2년치 주봉 데이터 필요
-        df = safe_stock_api_call(
-            stock.get_market_ohlcv_by_date,
-            start_date_str,
-            end_date_str,
-            code,
-            adjusted=True,
-            freq='w'  # 주봉 데이터
-        )
-        
-        if df is None or df.empty or len(df) < 52:  # 최소 1년치(52주) 데이터 필요
+        data = get_weekly_data(code, start_date_str, end_date_str)
+        if data is None:
+            logger.debug("%s 제외: 일봉 데이터 없음", code)
             return None
-            
-        # 이동평균선 계산
-        df['ma20'] = df['종가'].rolling(window=20).mean()
-        df['ma60'] = df['종가'].rolling(window=60).mean()
+        daily, df = data
         
-        # 볼린저 밴드 계산 (20일 기준)
-        df['bol_mid'] = df['종가'].rolling(window=20).mean()
-        bol_std = df['종가'].rolling(window=20).std()
-        df['bol_upper'] = df['bol_mid'] + 2 * bol_std
-        df['bol_lower'] = df['bol_mid'] - 2 * bol_std
+        if df.empty or len(df) < 52:  # 최소 1년치(52주) 데이터 필요
+            logger.debug("%s 제외: 주봉 %d개로 52주 미만", code, len(df))
+            return None
         
-        # 최근 피크와 저점 찾기
-        recent_df = df.iloc[-52:]  # 최근 1년
+        # 주봉은 여기서 한 번만 배열로 꺼내고 이후 계산은 배열로 처리
+        high = df['고가'].to_numpy()
+        low = df['저가'].to_numpy()
+        close = df['종가'].to_numpy()
+            
+        # 최근 피크와 저점 찾기 (최근 1년, 봉마다 반복하지 않고 이웃 봉과 한 번에 비교)
+        recent_high = high[-52:]
+        recent_low = low[-52:]
         
         # 고점 찾기 (전/후 봉보다 높은 봉)
-        peaks = []
-        for i in range(1, len(recent_df) - 1):
-            if recent_df.iloc[i]['고가'] > recent_df.iloc[i-1]['고가'] and recent_df.iloc[i]['고가'] > recent_df.iloc[i+1]['고가']:
-                peaks.append((i, recent_df.iloc[i]['고가']))
+        peak_idx = np.flatnonzero((recent_high[1:-1] > recent_high[:-2]) & (recent_high[1:-1] > recent_high[2:])) + 1
+        peaks = list(zip(peak_idx.tolist(), recent_high[peak_idx].tolist()))
         
         # 저점 찾기 (전/후 봉보다 낮은 봉)
-        troughs = []
-        for i in range(1, len(recent_df) - 1):
-            if recent_df.iloc[i]['저가'] < recent_df.iloc[i-1]['저가'] and recent_df.iloc[i]['저가'] < recent_df.iloc[i+1]['저가']:
-                troughs.append((i, recent_df.iloc[i]['저가']))
+        trough_idx = np.flatnonzero((recent_low[1:-1] < recent_low[:-2]) & (recent_low[1:-1] < recent_low[2:])) + 1
+        troughs = list(zip(trough_idx.tolist(), recent_low[trough_idx].tolist()))
         
         # 피크와 저점이 충분히 없으면 패턴 없음
         if len(peaks) < 2 or len(troughs) < 2:
+            logger.debug("%s 제외: 최근 52주 고점 %d개, 저점 %d개로 부족", code, len(peaks), len(troughs))
             return None
             
-        # 가장 최근 고점과 저점 찾기
-        latest_peak = max(peaks, key=lambda x: x[0])
-        latest_trough = max(troughs, key=lambda x: x[0])
+        # 가장 최근 고점과 저점 찾기 (위치 순으로 추가되므로 마지막 원소)
+        latest_peak = peaks[-1]
+        latest_trough = troughs[-1]
         
         # 현재가
-        current_price = df.iloc[-1]['종가']
+        current_price = close[-1]
         
         # 파동 패턴 검사를 위한 고점과 저점 정렬
         if latest_peak[0] > latest_trough[0]:
@@ -172,102 +366,64 @@ def process_stock(stock_info):
             pattern = "하락 후 반등"
         else:
             # 저점 → 고점 → 현재 (상승 후 조정 가능성)
-            prev_peak_idx = [p[0] for p in peaks if p[0] < latest_trough[0]]
-            if not prev_peak_idx:
+            # 저점 이전에 고점이 하나도 없으면 패턴 없음
+            # (고점은 위치 순으로 정렬되어 있으므로 첫 고점만 확인)
+            if peaks[0][0] >= latest_trough[0]:
+                logger.debug("%s 제외: 최근 저점 이전 고점 없음", code)
                 return None
                 
-            prev_peak = peaks[peaks.index(max(peaks, key=lambda x: x[0] if x[0] < latest_trough[0] else -1))]
             wave_high = latest_peak[1]
             wave_low = latest_trough[1]
             pattern = "상승 후 조정"
         
-        # 피보나치 되돌림 수준 계산
-        fib_levels = {}
+        # 피보나치 되돌림 수준 계산 (FIB_LEVEL_NAMES 순서, 비율 배열에 한 번에 곱함)
+        fib_range = wave_high - wave_low
         if pattern == "하락 후 반등":
-            fib_range = wave_high - wave_low
-            fib_levels = {
-                "0.0": wave_low,
-                "0.236": wave_low + 0.236 * fib_range,
-                "0.382": wave_low + 0.382 * fib_range,
-                "0.5": wave_low + 0.5 * fib_range,
-                "0.618": wave_low + 0.618 * fib_range,
-                "0.786": wave_low + 0.786 * fib_range,
-                "1.0": wave_high
-            }
+            fib_levels = wave_low + FIB_RATIOS * fib_range
         else:
-            fib_range = wave_high - wave_low
-            fib_levels = {
-                "0.0": wave_high,
-                "0.236": wave_high - 0.236 * fib_range,
-                "0.382": wave_high - 0.382 * fib_range,
-                "0.5": wave_high - 0.5 * fib_range,
-                "0.618": wave_high - 0.618 * fib_range,
-                "0.786": wave_high - 0.786 * fib_range,
-                "1.0": wave_low
-            }
+            fib_levels = wave_high - FIB_RATIOS * fib_range
         
         # 현재가가 어느 피보나치 수준에 있는지 확인
+        # 조정 패턴은 부호를 뒤집어 반등 패턴과 같은 오름차순 구간 탐색(이진 탐색)으로 처리
+        sign = 1 if pattern == "하락 후 반등" else -1
+        levels = sign * fib_levels
+        price = sign * current_price
         current_fib = None
-        for level in ["0.0", "0.236", "0.382", "0.5", "0.618", "0.786", "1.0"]:
-            if level == "0.0":
-                if current_price <= fib_levels["0.0"] and pattern == "하락 후 반등":
-                    current_fib = "0.0"
-                    break
-                elif current_price >= fib_levels["0.0"] and pattern == "상승 후 조정":
-                    current_fib = "0.0"
-                    break
-            elif level == "1.0":
-                if current_price >= fib_levels["1.0"] and pattern == "하락 후 반등":
-                    current_fib = "1.0"
-                    break
-                elif current_price <= fib_levels["1.0"] and pattern == "상승 후 조정":
-                    current_fib = "1.0"
-                    break
-            else:
-                next_level = ["0.236", "0.382", "0.5", "0.618", "0.786", "1.0"][["0.0", "0.236", "0.382", "0.5", "0.618", "0.786"].index(level)]
-                if pattern == "하락 후 반등":
-                    if fib_levels[level] <= current_price < fib_levels[next_level]:
-                        current_fib = level
-                        break
-                else:
-                    if fib_levels[next_level] < current_price <= fib_levels[level]:
-                        current_fib = level
-                        break
+        if price <= levels[0]:
+            current_fib = "0.0"
+        else:
+            # 되돌림 폭이 양수일 때만 수준이 정렬되어 있어 중간 구간이 존재
+            idx = np.searchsorted(levels, price, side='right') - 1 if fib_range > 0 else -1
+            if 1 <= idx <= 5:
+                current_fib = FIB_LEVEL_NAMES[idx]
+            elif price >= levels[-1]:
+                current_fib = "1.0"
         
         # 유망 파동주 조건
         # 1. 현재 주가가 특정 피보나치 레벨에 있고
         # 2. RSI 지표가 과매수/과매도 상태가 아니며
         # 3. 최근 트렌드가 반전 신호를 보이는 경우
         
-        # RSI 계산 (14일 기준)
-        delta = df['종가'].diff()
-        gain = delta.mask(delta < 0, 0)
-        loss = -delta.mask(delta > 0, 0)
-        avg_gain = gain.rolling(window=14).mean()
-        avg_loss = loss.rolling(window=14).mean()
-        rs = avg_gain / avg_loss
-        df['rsi'] = 100 - (100 / (1 + rs))
-        
-        current_rsi = df.iloc[-1]['rsi']
+        # 모든 조건이 0.382/0.5/0.618 수준을 요구하므로 그 밖이면 지표 계산 전에 제외
+        if current_fib not in ("0.382", "0.5", "0.618"):
+            logger.debug("%s 제외: %s 패턴 피보나치 %s 수준", code, pattern, current_fib)
+            return None
         
-        # MACD 계산
-        exp12 = df['종가'].ewm(span=12, adjust=False).mean()
-        exp26 = df['종가'].ewm(span=26, adjust=False).mean()
-        df['macd'] = exp12 - exp26
-        df['macd_signal'] = df['macd'].ewm(span=9, adjust=False).mean()
-        df['macd_hist'] = df['macd'] - df['macd_signal']
+        # 볼린저 밴드, RSI, MACD를 한 번의 JIT 커널로 계산
+        bol_upper, bol_lower, current_rsi, macd, macd_prev, macd_signal, macd_signal_prev = \
+            _wave_indicators(close.astype(np.float64))
         
         # 최근 MACD 방향
-        macd_direction = "상승" if df.iloc[-1]['macd'] > df.iloc[-2]['macd'] else "하락"
-        macd_cross = (df.iloc[-2]['macd'] < df.iloc[-2]['macd_signal'] and df.iloc[-1]['macd'] > df.iloc[-1]['macd_signal']) or \
-                    (df.iloc[-2]['macd'] > df.iloc[-2]['macd_signal'] and df.iloc[-1]['macd'] < df.iloc[-1]['macd_signal'])
+        macd_direction = "상승" if macd > macd_prev else "하락"
+        macd_cross = (macd_prev < macd_signal_prev and macd > macd_signal) or \
+                    (macd_prev > macd_signal_prev and macd < macd_signal)
         
         # 최근 5봉 전체 움직임
-        recent_trend = "상승" if df.iloc[-1]['종가'] > df.iloc[-5]['종가'] else "하락"
+        recent_trend = "상승" if close[-1] > close[-5] else "하락"
         
         # 볼린저 밴드 상태
-        in_lower_band = df.iloc[-1]['종가'] < df.iloc[-1]['bol_lower']
-        in_upper_band = df.iloc[-1]['종가'] > df.iloc[-1]['bol_upper']
+        in_lower_band = close[-1] < bol_lower
+        in_upper_band = close[-1] > bol_upper
         
         # 유망 파동주 판별
         is_promising = False
@@ -287,10 +443,22 @@ def process_stock(stock_info):
                 is_promising = True
         
         if not is_promising:
+            logger.debug(
+                "%s 제외: %s 패턴 피보나치 %s, RSI %.1f, MACD %s, 볼린저 하단 이탈 %s, 상단 돌파 %s",
+                code, pattern, current_fib, current_rsi, macd_direction, in_lower_band, in_upper_band,
+            )
             return None
             
-        # 티커명 가져오기
-        name = safe_stock_api_call(stock.get_market_ticker_name, code)
+        # 티커명 가져오기 (필터링 단계에서 조회한 이름 재사용)
+        name = code_to_name.get(code)
+        if name is None:
+            name = _ticker_name(code)
+        
+        # 전일 대비 등락률 (이미 받은 일봉에서 계산, 저장 시 재조회하지 않음)
+        daily_close = daily['종가'].to_numpy()
+        change_rate = 0.0
+        if len(daily_close) >= 2 and daily_close[-2] > 0:
+            change_rate = round(float(daily_close[-1] / daily_close[-2] - 1) * 100, 2)
         
         # 유망 종목 리턴
         return {
@@ -302,6 +470,7 @@ def process_stock(stock_info):
             'macd_direction': macd_direction,
             'macd_cross': macd_cross,
             'price': current_price,
+            'change_rate': change_rate,
             'wave_high': wave_high,
             'wave_low': wave_low
         }
@@ -315,7 +484,7 @@ def format_wave_message(results):
     if not results:
         return "오늘 감지된 파동주가 없습니다."
     
-    message = "🌊 *파동주 분석 결과* 🌊\n\n"
+    lines = ["🌊 *파동주 분석 결과* 🌊", ""]
     
     # 패턴별 분류
     rebound_stocks = [r for r in results if r['pattern'] == "하락 후 반등"]
@@ -323,32 +492,47 @@ def format_wave_message(results):
     
     # 반등 예상 종목
     if rebound_stocks:
-        message += "📈 *반등 예상 종목*\n"
-        for stock in rebound_stocks:
-            message += f"*{stock['name']}* ({stock['code']})\n"
-            message += f"현재가: {stock['price']:,}원\n"
-            message += f"피보나치: {stock['fib_level']} 수준\n"
-            message += f"RSI: {stock['rsi']:.1f}\n"
-            message += f"고점: {stock['wave_high']:,}원 / 저점: {stock['wave_low']:,}원\n"
-            message += f"MACD: {stock['macd_direction']} {'(골든크로스)' if stock['macd_cross'] and stock['macd_direction'] == '상승' else ''}\n\n"
+        lines.append("📈 *반등 예상 종목*")
+        for result in rebound_stocks:
+            lines += [
+                f"*{result['name']}* ({result['code']})",
+                f"현재가: {result['price']:,}원",
+                f"피보나치: {result['fib_level']} 수준",
+                f"RSI: {result['rsi']:.1f}",
+                f"고점: {result['wave_high']:,}원 / 저점: {result['wave_low']:,}원",
+                f"MACD: {result['macd_direction']} {'(골든크로스)' if result['macd_cross'] and result['macd_direction'] == '상승' else ''}",
+                "",
+            ]
     
     # 조정 후 매수 관심 종목
     if correction_stocks:
-        message += "🔍 *조정 후 매수 관심 종목*\n"
-        for stock in correction_stocks:
-            message += f"*{stock['name']}* ({stock['code']})\n"
-            message += f"현재가: {stock['price']:,}원\n"
-            message += f"피보나치: {stock['fib_level']} 수준\n"
-            message += f"RSI: {stock['rsi']:.1f}\n"
-            message += f"고점: {stock['wave_high']:,}원 / 저점: {stock['wave_low']:,}원\n"
-            message += f"MACD: {stock['macd_direction']} {'(데드크로스)' if stock['macd_cross'] and stock['macd_direction'] == '하락' else ''}\n\n"
+        lines.append("🔍 *조정 후 매수 관심 종목*")
+        for result in correction_stocks:
+            lines += [
+                f"*{result['name']}* ({result['code']})",
+                f"현재가: {result['price']:,}원",
+                f"피보나치: {result['fib_level']} 수준",
+                f"RSI: {result['rsi']:.1f}",
+                f"고점: {result['wave_high']:,}원 / 저점: {result['wave_low']:,}원",
+                f"MACD: {result['macd_direction']} {'(데드크로스)' if result['macd_cross'] and result['macd_direction'] == '하락' else ''}",
+                "",
+            ]
     
-    message += "⚠️ 주의: 피보나치 되돌림을 이용한 파동 분석은 참고용으로만 활용하시고, 실제 투자는 추가적인 분석과 함께 신중하게 결정하세요."
+    lines.append("⚠️ 주의: 피보나치 되돌림을 이용한 파동 분석은 참고용으로만 활용하시고, 실제 투자는 추가적인 분석과 함께 신중하게 결정하세요.")
     
-    return message
+    return "\n".join(lines)
 
-def save_to_database(results):
-    """파동주 분석 결과를 Supabase에 저장"""
+def save_to_database(results, kosdaq_codes):
+    """
+    파동주 분석 결과를 Supabase에 저장 (코스닥 종목은 kosdaq_stocks, 나머지는 kospi_stocks)
+    
+    Args:
+        results: process_stock 결과 딕셔너리 리스트
+        kosdaq_codes: 코스닥 종목코드 집합
+    
+    Returns:
+        성공 여부 (bool)
+    """
     try:
         if not results:
             logger.info("저장할 파동주 데이터가 없습니다.")
@@ -365,16 +549,21 @@ def save_to_database(results):
                     'code': result['code'],
                     'name': result['name'],
                     'price': float(result['price']),
-                    'change_rate': 0  # 변화율은 기본값으로 0 설정
+                    'change_rate': result['change_rate']
                 })
             except Exception as e:
                 logger.error(f"파동주 데이터 저장 준비 중 오류 ({result['code']}): {str(e)}")
         
-        # 시장 타입 확인 (더 정확한 방법 필요)
-        market_type = "kospi_stocks"  # 기본값
+        # 시장 타입 확인 (종목별 조회 대신 코스닥 종목 집합으로 구분)
+        kospi_data = [row for row in stock_data if row['code'] not in kosdaq_codes]
+        kosdaq_data = [row for row in stock_data if row['code'] in kosdaq_codes]
         
         # Supabase에 저장
-        result = save_stock_data(stock_data, market_type)
+        result = True
+        if kospi_data:
+            result = save_stock_data(kospi_data, "kospi_stocks") and result
+        if kosdaq_data:
+            result = save_stock_data(kosdaq_data, "kosdaq_stocks") and result
         return result
         
     except Exception as e:
@@ -383,7 +572,7 @@ def save_to_database(results):
 
 def run_analysis():
     """파동주 분석 실행"""
-    global start_date, end_date
+    global code_to_name
     
     logger.info("파동주 분석 시작...")
 
@@ -412,7 +601,7 @@ def run_analysis():
         
         for attempt in range(max_retries):
             logger.info(f"주식 목록 가져오기 시도 중... ({attempt+1}/{max_retries})")
-            all_stocks = safe_stock_api_call(stock.get_market_ticker_list, date=end_date_str)
+            all_stocks = safe_stock_api_call(get_market_ticker_list, date=end_date_str)
             
             if all_stocks and len(all_stocks) > 100:  # 정상적으로 100개 이상의 종목이 있어야 함
                 logger.info(f"주식 목록 가져오기 성공: {len(all_stocks)}개 종목")
@@ -428,75 +617,95 @@ def run_analysis():
             return []
 
         # 우선주 및 스팩주 제외 - 로깅 추가
-        filtered_stocks = []
         logger.info("우선주 및 스팩주 필터링 중...")
         
-        # 종목 수가 많은 경우 진행 상황 표시
-        for i, code in enumerate(all_stocks):
-            if i % 100 == 0:
-                logger.info(f"종목 필터링 진행 중... ({i}/{len(all_stocks)})")
-                
-            try:
-                name = safe_stock_api_call(stock.get_market_ticker_name, code)
-                if name and not code.endswith(('5', '7', '9')) and '우' not in name and '스팩' not in name and not code.startswith('43'):
-                    filtered_stocks.append(code)
-            except Exception as e:
-                logger.warning(f"종목명 가져오기 실패 ({code}): {str(e)}")
-                continue
+        # 종목코드만으로 제외되는 종목은 종목명을 조회하지 않음 (전 종목에 문자열 연산을 한 번에 적용)
+        codes = pd.Index(all_stocks)
+        candidates = codes[
+            ~codes.str.endswith(EXCLUDED_CODE_SUFFIXES) & ~codes.str.startswith(EXCLUDED_CODE_PREFIXES)
+        ].tolist()
+        
+        # 전 종목 이름을 한 번에 조회하고, 빠진 종목만 종목별로 조회
+        # (종목별 조회는 네트워크 대기가 대부분이므로 스레드로 동시에 요청)
+        all_names = get_ticker_names(end_date_str)
+        missing = [code for code in candidates if code not in all_names]
+        if missing:
+            logger.info(f"종목명 개별 조회: {len(missing)}개 종목")
+            with ThreadPoolExecutor(max_workers=KRX_MAX_WORKERS) as executor:
+                all_names.update(zip(missing, executor.map(_ticker_name_or_none, missing)))
+        
+        # 이름이 없거나 제외 패턴에 걸리는 종목 제외
+        names = pd.Series(all_names, dtype=object).reindex(candidates).fillna('')
+        names = names[(names != '') & ~names.str.contains(EXCLUDED_NAME_PATTERN, na=True)]
+        filtered_stocks = names.index.tolist()
+        code_to_name = names.to_dict()
 
         logger.info(f"종목 필터링 완료: {len(filtered_stocks)}개 종목 (우선주 및 스팩주 제외)")
         
-        # 시가총액 가져오기 - 진행 상황 로깅 추가
-        marcap_dict = {}
+        # 시가총액 가져오기 - 종목별 조회 대신 전 종목 스냅샷 한 번으로 조회
         logger.info("시가총액 데이터 수집 중...")
-        
-        for i, code in enumerate(filtered_stocks):
-            if i % 100 == 0:
-                logger.info(f"시가총액 데이터 수집 중... ({i}/{len(filtered_stocks)})")
-                
-            try:
-                marcap = safe_stock_api_call(
-                    stock.get_market_cap_by_date, 
-                    end_date.strftime('%Y%m%d'),
-                    end_date.strftime('%Y%m%d'),
-                    code
-                )
-                
-                if marcap is not None and not marcap.empty:
-                    marcap_dict[code] = marcap['시가총액'].iloc[-1]
-            except Exception as e:
-                logger.error(f"시가총액 가져오기 실패 ({code}): {str(e)}")
-                
-            # 너무 빠르게 요청하지 않도록 약간의 딜레이 추가
-            if i % 20 == 0:
-                time.sleep(1)  # 20개 종목마다 1초 대기
+        marcap_dict = {}
+        cap_df = safe_stock_api_call(get_market_cap_by_ticker, end_date_str, market="ALL")
+        if cap_df is not None and not cap_df.empty:
+            marcap_dict = cap_df['시가총액'].to_dict()
+        else:
+            logger.warning("시가총액 데이터를 가져오지 못했습니다.")
 
-        stocks_to_analyze = [(code, marcap_dict.get(code, 0)) for code in filtered_stocks]
+        # 시가총액이 큰 종목부터 분석 (최대 종목 수 제한 시 큰 종목 우선)
+        stocks_to_analyze = sorted(
+            ((code, marcap_dict.get(code, 0)) for code in filtered_stocks),
+            key=lambda x: x[1],
+            reverse=True
+        )
         logger.info(f"분석 대상 종목: {len(stocks_to_analyze)}개")
 
         logger.info("피보나치 되돌림 분석 시작 (주봉 기준)...")
         
-        # 멀티프로세싱 풀 생성
-        processes = min(cpu_count(), 4)  # CPU 코어 수와 4 중 작은 값 사용
-        with Pool(processes) as p:
-            results = list(tqdm(p.imap(process_stock, stocks_to_analyze), total=len(stocks_to_analyze)))
+        # 종목별 분석은 KRX 조회 대기가 대부분이므로 스레드로 동시에 처리
+        # (조회 기간은 인자로 넘기고, 종목명 사전은 전역 변수를 그대로 공유)
+        selected_results = []
+        with ThreadPoolExecutor(max_workers=KRX_MAX_WORKERS) as executor:
+            # 저장 시 시장 구분에 쓸 코스닥 종목 목록은 분석과 함께 미리 조회
+            kosdaq_future = executor.submit(
+                safe_stock_api_call, get_market_ticker_list, date=end_date_str, market="KOSDAQ"
+            )
+            futures = [
+                executor.submit(process_stock, stock_info, start_date, end_date)
+                for stock_info in stocks_to_analyze
+            ]
+            # 터미널이 아닐 때(GitHub Actions 로그 등)는 진행률 표시 생략
+            for future in tqdm(as_completed(futures), total=len(futures), disable=not sys.stderr.isatty()):
+                result = future.result()
+                if not result:
+                    continue
+                selected_results.append(result)
+                # 최대 종목 수에 도달하면 아직 시작하지 않은 종목은 취소
+                if WAVE_MAX_RESULTS and len(selected_results) >= WAVE_MAX_RESULTS:
+                    logger.info(f"최대 종목 수({WAVE_MAX_RESULTS}개)에 도달하여 남은 종목 분석을 중단합니다.")
+                    for pending in futures:
+                        pending.cancel()
+                    break
 
-        # 결과 필터링
-        selected_results = [result for result in results if result]
+        # 결과 정렬 (메시지 순서는 기존처럼 종목 목록 순서로 유지)
+        order = {code: i for i, code in enumerate(filtered_stocks)}
+        selected_results.sort(key=lambda r: order[r['code']])
         logger.info(f"분석 완료: {len(selected_results)}개 종목 발견")
 
-        # Supabase에 저장
+        # Supabase 저장은 별도 스레드에서 진행하고 그동안 텔레그램 메시지를 전송
         logger.info("데이터베이스 저장 중...")
-        save_result = save_to_database(selected_results)
-        if save_result:
-            logger.info("데이터베이스 저장 완료")
-        else:
-            logger.warning("데이터베이스 저장 실패")
+        kosdaq_codes = set(kosdaq_future.result() or [])
+        with ThreadPoolExecutor(max_workers=1) as writer:
+            save_future = writer.submit(save_to_database, selected_results, kosdaq_codes)
+
+            # 텔레그램 전송 (코스피/코스닥 봇으로 전송)
+            message = format_wave_message(selected_results)
+            send_telegram_message(message, is_kospi=True)
+            logger.info("텔레그램 메시지 전송 완료")
 
-        # 텔레그램 전송 (코스피/코스닥 봇으로 전송)
-        message = format_wave_message(selected_results)
-        send_telegram_message(message, is_kospi=True)
-        logger.info("텔레그램 메시지 전송 완료")
+            if save_future.result():
+                logger.info("데이터베이스 저장 완료")
+            else:
+                logger.warning("데이터베이스 저장 실패")
 
         return selected_results
 
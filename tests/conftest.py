@@ -0,0 +1,10 @@
+import os
+import sys
+
+# 저장소 루트에서 실행하지 않아도 scripts/utils 패키지를 찾을 수 있도록 경로 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# utils.database가 import 시 Supabase 클라이언트를 만들므로 .env가 없어도 import되도록 기본값 지정
+# (테스트는 데이터베이스에 접속하지 않음)
+os.environ.setdefault('SUPABASE_URL', 'http://localhost')
+os.environ.setdefault('SUPABASE_KEY', 'test')
@@ -0,0 +1,91 @@
+import os
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+
+from utils.file_cache import FileCache, cached, _MISS
+
+def _age(cache, key, hours):
+    """저장된 캐시 파일의 수정 시각을 hours 시간 전으로 되돌리기"""
+    for ext in ('parquet', 'json'):
+        path = cache._path(key, ext)
+        if os.path.exists(path):
+            stamp = time.time() - hours * 3600
+            os.utime(path, (stamp, stamp))
+
+@pytest.fixture
+def cache(tmp_path):
+    return FileCache(str(tmp_path))
+
+def test_roundtrip_dataframe_and_json(cache):
+    df = pd.DataFrame({'종가': [100, 110]}, index=['005930', '000660'])
+    cache.set('df', df)
+    cache.set('list', ['005930', '000660'])
+
+    pd.testing.assert_frame_equal(cache.get('df', timedelta(days=1)), df)
+    assert cache.get('list', timedelta(days=1)) == ['005930', '000660']
+
+@pytest.mark.parametrize('value', [None, [], {}, pd.DataFrame()])
+def test_empty_values_are_not_stored(cache, value):
+    cache.set('empty', value)
+    assert cache.get('empty', timedelta(days=1)) is _MISS
+
+def test_expired_entry_is_a_miss(cache):
+    cache.set('key', [1])
+    _age(cache, 'key', hours=2)
+
+    assert cache.get('key', timedelta(hours=3)) == [1]
+    assert cache.get('key', timedelta(hours=1)) is _MISS
+
+def test_open_ttl_applies_until_covered_date_has_passed(cache):
+    today = datetime.now().strftime('%Y%m%d')
+    yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y%m%d')
+    cache.set('key', [1])
+    _age(cache, 'key', hours=0.5)
+
+    # 조회일 당일에 저장된 결과는 open_ttl 적용
+    assert cache.get('key', timedelta(days=365), today, timedelta(minutes=10)) is _MISS
+    # 조회일이 지난 뒤 저장된 결과는 ttl 적용
+    assert cache.get('key', timedelta(days=365), yesterday, timedelta(minutes=10)) == [1]
+
+def test_cached_reuses_result_per_arguments(cache):
+    calls = []
+
+    @cached(cache=cache)
+    def fetch(date, market="KOSPI"):
+        calls.append((date, market))
+        return [date, market]
+
+    assert fetch('20240102') == ['20240102', 'KOSPI']
+    assert fetch('20240102') == ['20240102', 'KOSPI']
+    assert fetch('20240102', market="KOSDAQ") == ['20240102', 'KOSDAQ']
+    assert calls == [('20240102', 'KOSPI'), ('20240102', 'KOSDAQ')]
+
+def test_cached_refetches_same_day_result_after_today_ttl(cache):
+    today = datetime.now().strftime('%Y%m%d')
+    calls = []
+
+    @cached(cache=cache, today_ttl=timedelta(hours=12))
+    def fetch(date):
+        calls.append(date)
+        return [len(calls)]
+
+    key = FileCache.make_key(f"{fetch.__module__}.{fetch.__name__}", today)
+    assert fetch(today) == [1]
+    _age(cache, key, hours=13)
+    assert fetch(today) == [2]
+
+def test_cached_skips_results_rejected_by_validate(cache):
+    results = iter([[], list(range(50)), list(range(200)), []])
+
+    @cached(cache=cache, validate=lambda tickers: len(tickers) > 100)
+    def fetch(date):
+        return next(results)
+
+    assert fetch('20240102') == []
+    assert len(fetch('20240102')) == 50
+    assert len(fetch('20240102')) == 200
+    # 조건을 만족한 결과만 저장되어 이후 호출에 재사용
+    assert len(fetch('20240102')) == 200
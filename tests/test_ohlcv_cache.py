@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import ohlcv_cache
+from scripts import wave_analysis as wave
+
+def _history(start='2021-01-04', end='2024-03-29', seed=0):
+    dates = pd.bdate_range(start, end)
+    close = np.round(np.cumprod(1 + np.random.default_rng(seed).normal(0, 0.02, len(dates))) * 10000)
+    return pd.DataFrame({
+        '시가': close, '고가': close + 100, '저가': close - 100, '종가': close,
+        '거래량': np.full(len(dates), 1_000),
+    }, index=pd.DatetimeIndex(dates, name='날짜')).astype(np.int64)
+
+class FakeKrx:
+    """get_market_ohlcv_by_date 대신 준비된 일봉에서 기간을 잘라 반환하고 요청을 기록"""
+
+    def __init__(self, history):
+        self.history = history
+        self.calls = []
+
+    def get_market_ohlcv_by_date(self, fromdate, todate, ticker, adjusted=True):
+        self.calls.append((fromdate, todate))
+        return self.history.loc[pd.Timestamp(fromdate):pd.Timestamp(todate)].copy()
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(ohlcv_cache, 'OHLCV_CACHE_DIR', str(tmp_path))
+
+@pytest.fixture
+def krx(monkeypatch):
+    def install(history):
+        fake = FakeKrx(history)
+        monkeypatch.setattr(wave.stock, 'get_market_ohlcv_by_date', fake.get_market_ohlcv_by_date)
+        return fake
+    return install
+
+def test_save_and_load_keep_history_start():
+    df = _history('2024-03-04', '2024-03-08')
+    ohlcv_cache.save('005930', df, history_start=pd.Timestamp('2021-03-01'))
+
+    loaded, history_start = ohlcv_cache.load('005930')
+    pd.testing.assert_frame_equal(loaded, df, check_freq=False)
+    assert history_start == pd.Timestamp('2021-03-01')
+
+def test_load_without_metadata_uses_first_row():
+    df = _history('2024-03-04', '2024-03-08')
+    ohlcv_cache.save('005930', df)
+    assert ohlcv_cache.load('005930')[1] == df.index[0]
+    assert ohlcv_cache.load('000660') is None
+
+def test_incremental_fetch_matches_full_fetch(krx):
+    history = _history()
+    fake = krx(history)
+
+    wave.get_weekly_data('005930', '20210301', '20240301')
+    daily, weekly = wave.get_weekly_data('005930', '20210308', '20240329')
+
+    # 두 번째 실행은 마지막 캐시일부터만 조회
+    assert fake.calls == [('20210301', '20240301'), ('20240301', '20240329')]
+    expected = history.loc['2021-03-08':'2024-03-29']
+    pd.testing.assert_frame_equal(daily, expected, check_freq=False)
+    pd.testing.assert_frame_equal(weekly, wave._resample_weekly(expected).astype(np.int64))
+    pd.testing.assert_frame_equal(ohlcv_cache.load('005930')[0], expected, check_freq=False)
+
+def test_recent_listing_reuses_cache(krx):
+    # 조회 시작일 이후에 상장한 종목도 캐시를 이어 붙여 사용
+    fake = krx(_history(start='2023-06-01'))
+
+    wave.get_weekly_data('123456', '20210301', '20240301')
+    wave.get_weekly_data('123456', '20210308', '20240329')
+
+    assert fake.calls == [('20210301', '20240301'), ('20240301', '20240329')]
+
+def test_adjusted_price_change_refetches_everything(krx):
+    history = _history()
+    fake = krx(history)
+    wave.get_weekly_data('005930', '20210301', '20240301')
+
+    # 액면분할 등으로 수정주가가 바뀌면 마지막 캐시일 종가가 달라짐
+    fake.history = history // 2
+    daily, _ = wave.get_weekly_data('005930', '20210308', '20240329')
+
+    assert fake.calls[-1] == ('20210308', '20240329')
+    pd.testing.assert_frame_equal(daily, (history // 2).loc['2021-03-08':'2024-03-29'], check_freq=False)
@@ -0,0 +1,52 @@
+from datetime import datetime
+
+import pytest
+import pytz
+
+from utils import scheduling
+
+KR_TZ = pytz.timezone('Asia/Seoul')
+
+@pytest.fixture
+def freeze(monkeypatch):
+    """scheduling 모듈의 현재 시각을 지정한 UTC 시각으로 고정"""
+    def _freeze(*utc):
+        frozen = pytz.utc.localize(datetime(*utc))
+
+        class FrozenDatetime(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return frozen.astimezone(tz) if tz else frozen.replace(tzinfo=None)
+
+        monkeypatch.setattr(scheduling, 'datetime', FrozenDatetime)
+    return _freeze
+
+def _kst(*args):
+    return KR_TZ.localize(datetime(*args))
+
+def test_later_today(freeze):
+    # 월요일 16:30 KST (07:30 UTC)
+    freeze(2024, 1, 1, 7, 30)
+    assert scheduling.next_run_time(17, 0, KR_TZ) == _kst(2024, 1, 1, 17, 0)
+    assert scheduling.seconds_until(17, 0, KR_TZ) == 30 * 60
+
+def test_after_kst_midnight_uses_kst_date(freeze):
+    # UTC로는 목요일이지만 한국은 이미 금요일 01:00
+    freeze(2024, 1, 4, 16, 0)
+    assert scheduling.next_run_time(17, 0, KR_TZ) == _kst(2024, 1, 5, 17, 0)
+
+def test_just_before_kst_midnight_rolls_to_next_day(freeze):
+    # 월요일 23:59 KST (14:59 UTC)
+    freeze(2024, 1, 1, 14, 59)
+    assert scheduling.next_run_time(17, 0, KR_TZ) == _kst(2024, 1, 2, 17, 0)
+
+def test_friday_evening_skips_weekend(freeze):
+    # 금요일 17:00 KST 정각은 이미 지난 것으로 보고 월요일로 넘김
+    freeze(2024, 1, 5, 8, 0)
+    assert scheduling.next_run_time(17, 0, KR_TZ) == _kst(2024, 1, 8, 17, 0)
+
+def test_saturday_in_kst_while_friday_in_utc(freeze):
+    # UTC 금요일 15:30 = KST 토요일 00:30
+    freeze(2024, 1, 5, 15, 30)
+    assert scheduling.next_run_time(9, 0, KR_TZ) == _kst(2024, 1, 8, 9, 0)
+    assert scheduling.next_run_time(9, 0, KR_TZ, weekdays_only=False) == _kst(2024, 1, 6, 9, 0)
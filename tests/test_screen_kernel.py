@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts import potential_stock_finder as finder
+
+def _make_panel(n_codes=300, seed=0):
+    """상장 기간과 추세가 제각각인 종목들의 (date, code) 패널 생성"""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range('2024-01-01', periods=140)
+    frames = {}
+    for k in range(n_codes):
+        days = int(rng.integers(80, len(dates) + 1))
+        close = np.round(np.cumprod(1 + rng.normal(0.003, 0.02, days)) * 10000)
+        volume = rng.integers(10_000, 50_000, days).astype(np.int64)
+        volume[-int(rng.integers(1, 8))] *= int(rng.choice([1, 3]))
+        frames[f"{k:06d}"] = pd.DataFrame({'종가': close, '거래량': volume}, index=dates[-days:])
+    return pd.concat(frames, names=['code', 'date']).swaplevel().sort_index()
+
+def _reference_screen(panel):
+    """종목별 pandas rolling으로 계산한 급등주 조건 (기존 종목별 검사와 같은 의미)"""
+    selected = []
+    for code, df in panel.groupby(level='code'):
+        close = df['종가'].astype(float).reset_index(drop=True)
+        volume = df['거래량'].astype(float).reset_index(drop=True)
+        if len(df) < 100:
+            continue
+        if (close.diff().iloc[-4:] > 0).sum() < 3:
+            continue
+        ma20 = close.rolling(20).mean().iloc[-1]
+        ma60 = close.rolling(60).mean().iloc[-1]
+        ma120 = close.rolling(120).mean().iloc[-1]
+        if not close.iloc[-1] > ma20 or not ma20 > ma60 or ma60 <= ma120:
+            continue
+        volume_ma20 = volume.rolling(20).mean()
+        if (volume.iloc[-5:] > volume_ma20.iloc[-5:] * 2.0).any():
+            selected.append(code)
+    return selected
+
+@pytest.fixture(scope='module')
+def panel():
+    return _make_panel()
+
+def test_panel_to_arrays_right_aligns_each_code(panel):
+    codes, close, volume = finder.panel_to_arrays(panel)
+    for i in (0, 7, len(codes) - 1):
+        expected = panel.xs(codes[i], level='code')
+        row = close[i][~np.isnan(close[i])]
+        np.testing.assert_array_equal(row, expected['종가'].to_numpy(np.float64))
+        assert not np.isnan(close[i, -1])
+        np.testing.assert_array_equal(volume[i, -len(expected):], expected['거래량'].to_numpy(np.float64))
+
+def test_screen_kernel_matches_pandas_rolling(panel):
+    codes, close, volume = finder.panel_to_arrays(panel)
+    selected = finder._screen_kernel(close, volume)
+    expected = _reference_screen(panel)
+    assert expected, "조건을 만족하는 종목이 하나는 있어야 비교 의미가 있음"
+    assert [code for code, ok in zip(codes, selected) if ok] == expected
+
+@pytest.mark.parametrize('numba_available', [True, False])
+def test_screen_panel_paths_match_reference(panel, monkeypatch, numba_available):
+    monkeypatch.setattr(finder, 'NUMBA_AVAILABLE', numba_available)
+    assert finder.screen_panel(panel) == _reference_screen(panel)
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts import wave_analysis as wave
+
+def _reference_indicators(close):
+    """pandas rolling/ewm으로 계산한 마지막 봉 기준 지표"""
+    s = pd.Series(close)
+
+    mid = s.rolling(20).mean().iloc[-1]
+    std = s.rolling(20).std().iloc[-1]
+
+    # Wilder RSI: 첫 14개 등락의 단순평균으로 시작해 alpha=1/14로 평활
+    diff = s.diff()
+    gain, loss = diff.clip(lower=0), (-diff).clip(lower=0)
+    def wilder(x):
+        seeded = pd.concat([pd.Series([x.iloc[1:15].mean()]), x.iloc[15:]], ignore_index=True)
+        return seeded.ewm(alpha=1 / 14, adjust=False).mean().iloc[-1]
+    avg_loss = wilder(loss)
+    rsi = np.nan if avg_loss == 0 else 100 - 100 / (1 + wilder(gain) / avg_loss)
+
+    macd = s.ewm(span=12, adjust=False).mean() - s.ewm(span=26, adjust=False).mean()
+    signal = macd.ewm(span=9, adjust=False).mean()
+
+    return (mid + 2 * std, mid - 2 * std, rsi,
+            macd.iloc[-1], macd.iloc[-2], signal.iloc[-1], signal.iloc[-2])
+
+@pytest.mark.parametrize('seed', range(5))
+def test_wave_indicators_match_pandas(seed):
+    rng = np.random.default_rng(seed)
+    close = np.round(np.cumprod(1 + rng.normal(0, 0.05, 156)) * 10000).astype(np.float64)
+    np.testing.assert_allclose(wave._wave_indicators(close), _reference_indicators(close), rtol=1e-9)
+
+def test_wave_indicators_rsi_is_nan_without_losses():
+    close = np.arange(1, 61, dtype=np.float64)
+    assert np.isnan(wave._wave_indicators(close)[2])
+
+def test_resample_weekly_matches_pandas_resample():
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range('2023-12-20', '2024-03-29')
+    # 거래가 없는 주(설 연휴 주간 전체)와 주중 휴장일 제외
+    dates = dates[~((dates >= '2024-02-05') & (dates <= '2024-02-11'))].drop(pd.Timestamp('2024-01-01'))
+    close = np.round(np.cumprod(1 + rng.normal(0, 0.02, len(dates))) * 10000).astype(np.int64)
+    daily = pd.DataFrame({
+        '시가': close - 50, '고가': close + 100, '저가': close - 100, '종가': close,
+        '거래량': rng.integers(1_000, 9_000, len(dates)),
+    }, index=pd.DatetimeIndex(dates, name='날짜'))
+    daily.iloc[3, 1] += 1_000
+
+    expected = daily.resample('W').agg(
+        {'시가': 'first', '고가': 'max', '저가': 'min', '종가': 'last', '거래량': 'sum'}
+    ).dropna()
+    result = wave._resample_weekly(daily)
+
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False, check_freq=False)
+    assert pd.Timestamp('2024-02-11') not in result.index
@@ -1,12 +1,18 @@
 import os
+import logging
 from supabase import create_client
 from datetime import datetime
 import pandas as pd
 from config.config import SUPABASE_URL, SUPABASE_KEY
 
+logger = logging.getLogger(__name__)
+
 # Supabase 클라이언트 초기화
 supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
 
+# 한 번의 insert 요청에 담을 최대 행 수 (요청 크기 제한 대비)
+INSERT_BATCH_SIZE = 500
+
 def create_tables():
     """
     데이터베이스 테이블 생성 (이미 존재하는 경우 무시)
@@ -17,11 +23,11 @@ def create_tables():
             
         # Supabase SQL 실행
         # Supabase는 SQL API를 통해 스키마를 직접 생성해야 함
-        print("스키마 SQL 파일이 준비되었습니다.")
-        print("Supabase 대시보드에서 SQL 에디터를 통해 schema.sql 파일의 내용을 실행해주세요.")
+        logger.info("스키마 SQL 파일이 준비되었습니다.")
+        logger.info("Supabase 대시보드에서 SQL 에디터를 통해 schema.sql 파일의 내용을 실행해주세요.")
         return True
     except Exception as e:
-        print(f"테이블 생성 중 오류 발생: {e}")
+        logger.error(f"테이블 생성 중 오류 발생: {e}")
         return False
 
 def save_stock_data(stocks_data, table_name="kospi_stocks"):
@@ -40,10 +46,11 @@ def save_stock_data(stocks_data, table_name="kospi_stocks"):
         today = datetime.now().strftime('%Y-%m-%d')
         
         if not stocks_data:
-            print("저장할 데이터가 없습니다.")
+            logger.info("저장할 데이터가 없습니다.")
             return False
         
-        # 데이터 저장
+        # 저장할 행 목록 구성
+        rows = []
         for stock in stocks_data:
             if isinstance(stock, dict):
                 # 이미 딕셔너리 형태인 경우
@@ -61,19 +68,21 @@ def save_stock_data(stocks_data, table_name="kospi_stocks"):
                     'price': 0,  # 실제 값으로 수정 필요
                     'change_rate': 0  # 실제 값으로 수정 필요
                 }
-            
-            # Supabase에 데이터 저장
-            result = supabase.table(table_name).insert(stock_data).execute()
+            rows.append(stock_data)
+        
+        # Supabase에 데이터 저장 (행마다 요청하지 않고 묶어서 한 번에 insert)
+        for i in range(0, len(rows), INSERT_BATCH_SIZE):
+            result = supabase.table(table_name).insert(rows[i:i + INSERT_BATCH_SIZE]).execute()
             
             if hasattr(result, 'error') and result.error:
-                print(f"데이터 저장 중 오류 발생: {result.error}")
+                logger.error(f"데이터 저장 중 오류 발생: {result.error}")
                 return False
         
-        print(f"{len(stocks_data)}개의 종목 데이터가 성공적으로 저장되었습니다.")
+        logger.info(f"{len(stocks_data)}개의 종목 데이터가 성공적으로 저장되었습니다.")
         return True
         
     except Exception as e:
-        print(f"데이터 저장 중 오류 발생: {e}")
+        logger.error(f"데이터 저장 중 오류 발생: {e}")
         return False
 
 def get_stock_data(table_name="kospi_stocks", limit=100):
@@ -91,10 +100,10 @@ def get_stock_data(table_name="kospi_stocks", limit=100):
         result = supabase.table(table_name).select("*").limit(limit).execute()
         
         if hasattr(result, 'error') and result.error:
-            print(f"데이터 조회 중 오류 발생: {result.error}")
+            logger.error(f"데이터 조회 중 오류 발생: {result.error}")
             return []
         
         return result.data
     except Exception as e:
-        print(f"데이터 조회 중 오류 발생: {e}")
+        logger.error(f"데이터 조회 중 오류 발생: {e}")
         return [] 
\ No newline at end of file
@@ -0,0 +1,159 @@
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+import threading
+import functools
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# 기본 캐시 디렉토리 (프로젝트 루트의 .cache)
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), '.cache')
+
+_MISS = object()
+
+# 인자에 포함된 조회일 (YYYYMMDD)
+_DATE_PATTERN = re.compile(r'(?<!\d)(\d{8})(?!\d)')
+
+class FileCache:
+    """
+    파일 기반 캐시
+
+    DataFrame은 parquet, 그 외 값은 JSON 파일로 저장하며
+    파일 수정 시각(저장 시각)을 기준으로 만료 여부를 판단합니다.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir
+
+    @staticmethod
+    def make_key(name, *args, **kwargs):
+        """
+        함수 이름과 인자로 캐시 키(MD5) 생성
+
+        Args:
+            name: 함수 이름
+            *args, **kwargs: 함수에 전달된 인자들
+
+        Returns:
+            str: 캐시 키
+        """
+        raw = f"{name}:{args}:{sorted(kwargs.items())}"
+        return hashlib.md5(raw.encode('utf-8')).hexdigest()
+
+    def _path(self, key, ext):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.{ext}")
+
+    def get(self, key, ttl, covered_date=None, open_ttl=None):
+        """
+        캐시 조회
+
+        Args:
+            key: 캐시 키
+            ttl: 유효 기간 (timedelta)
+            covered_date: 조회 결과가 다루는 마지막 날짜 (YYYYMMDD, 없으면 None)
+            open_ttl: covered_date 당일이나 그 이전에 저장된 항목의 유효 기간
+                (장중 등 아직 확정되지 않은 데이터일 수 있음)
+
+        Returns:
+            캐시된 값 또는 없거나 만료된 경우 _MISS
+        """
+        for ext in ('parquet', 'json'):
+            path = self._path(key, ext)
+            if not os.path.exists(path):
+                continue
+            written_at = os.path.getmtime(path)
+            if covered_date is not None and open_ttl is not None \
+                    and datetime.fromtimestamp(written_at).strftime('%Y%m%d') <= covered_date:
+                ttl = open_ttl
+            if time.time() - written_at > ttl.total_seconds():
+                return _MISS
+            try:
+                if ext == 'parquet':
+                    return pd.read_parquet(path)
+                with open(path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except Exception as e:
+                logger.warning(f"캐시 읽기 실패 ({path}): {str(e)}")
+                return _MISS
+        return _MISS
+
+    def set(self, key, value):
+        """
+        캐시 저장 (None과 빈 DataFrame/리스트/딕셔너리는 저장하지 않음)
+
+        Args:
+            key: 캐시 키
+            value: 저장할 값 (DataFrame 또는 JSON 직렬화 가능한 값)
+        """
+        if value is None or (isinstance(value, pd.DataFrame) and value.empty):
+            return
+        # 일시적인 조회 실패로 받은 빈 결과가 유효 기간 동안 재사용되지 않도록 함
+        if isinstance(value, (list, tuple, dict)) and not value:
+            return
+
+        ext = 'parquet' if isinstance(value, pd.DataFrame) else 'json'
+        path = self._path(key, ext)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            if ext == 'parquet':
+                value.to_parquet(tmp_path)
+            else:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(value, f, ensure_ascii=False)
+            # 동시 실행 시 읽는 쪽이 반쯤 쓰인 파일을 보지 않도록 교체 방식으로 저장
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"캐시 저장 실패 ({path}): {str(e)}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+_default_cache = FileCache()
+
+def cached(ttl=timedelta(days=365), today_ttl=timedelta(hours=12), cache=None, validate=None):
+    """
+    함수 결과를 파일 캐시에 저장하는 데코레이터
+
+    인자에 포함된 조회일(YYYYMMDD) 중 가장 늦은 날짜 당일이나 그 이전에 저장된 결과는
+    장중 값 등 아직 바뀔 수 있는 데이터이므로 today_ttl을, 그 날짜가 지난 뒤에 저장된
+    (확정된) 결과와 날짜 인자가 없는 호출은 ttl을 유효 기간으로 사용합니다.
+    조회 시점이 아니라 저장 시점으로 판단하므로 장중에 받은 결과가 다음 날부터
+    지난 기간 조회로 취급되어 오래 남지 않습니다.
+
+    Args:
+        ttl: 확정된 조회 결과의 유효 기간
+        today_ttl: 조회일 당일(또는 그 이전)에 저장된 조회 결과의 유효 기간
+        cache: 사용할 FileCache (기본값: 프로젝트 .cache 디렉토리)
+        validate: 결과를 받아 캐시에 저장할지 판단하는 함수 (False면 저장하지 않음)
+
+    Returns:
+        데코레이터 함수
+    """
+    def decorator(func):
+        name = f"{func.__module__}.{func.__name__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            store = cache or _default_cache
+            key = FileCache.make_key(name, *args, **kwargs)
+
+            dates = [d for arg in (*args, *kwargs.values()) for d in _DATE_PATTERN.findall(str(arg))]
+            covered_date = max(dates) if dates else None
+
+            value = store.get(key, ttl, covered_date, today_ttl)
+            if value is not _MISS:
+                return value
+
+            value = func(*args, **kwargs)
+            if validate is None or validate(value):
+                store.set(key, value)
+            return value
+
+        return wrapper
+    return decorator
@@ -0,0 +1,26 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """
+        numba가 없는 환경용 대체 데코레이터 (함수를 그대로 반환)
+
+        @njit 와 @njit(parallel=True) 두 형태를 모두 지원합니다.
+        """
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+
+        return decorator
+
+    logger.info("numba가 설치되어 있지 않아 JIT 없이 실행합니다.")
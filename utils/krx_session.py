@@ -0,0 +1,40 @@
+import logging
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+_session = None
+
+def install_krx_session(pool_size=16):
+    """
+    pykrx의 HTTP 호출이 keep-alive 세션을 재사용하도록 설정
+
+    pykrx는 요청마다 requests.get/post를 호출해 매번 새 TCP/TLS 연결을 맺습니다.
+    pykrx 내부 webio 모듈의 requests를 커넥션 풀을 가진 Session으로 교체해
+    동시 요청 간에 연결을 재사용합니다.
+
+    Args:
+        pool_size: 커넥션 풀 크기 (동시 요청 수 이상으로 설정)
+
+    Returns:
+        requests.Session: 설치된 세션
+    """
+    global _session
+
+    if _session is not None:
+        return _session
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+    try:
+        from pykrx.website.comm import webio
+        webio.requests = session
+    except ImportError as e:
+        logger.warning(f"pykrx 세션 설정 실패, 기본 연결 방식을 사용합니다: {str(e)}")
+
+    _session = session
+    return session
@@ -0,0 +1,83 @@
+import os
+import json
+import logging
+import threading
+
+import pandas as pd
+
+from utils.file_cache import CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+# 종목별 일봉 캐시 디렉토리
+OHLCV_CACHE_DIR = os.path.join(CACHE_DIR, 'ohlcv')
+
+def _path(code, ext='parquet'):
+    return os.path.join(OHLCV_CACHE_DIR, f"{code}.{ext}")
+
+def load(code):
+    """
+    종목별 일봉 캐시 읽기
+
+    Args:
+        code: 종목코드
+
+    Returns:
+        (DataFrame, 기록 시작일 Timestamp) 튜플 또는 캐시가 없거나 읽기 실패 시 None
+        기록 시작일은 저장 당시 요청한 조회 시작일로, 상장일이 그보다 늦으면
+        첫 행 날짜보다 앞설 수 있습니다. 메타데이터가 없는 캐시는 첫 행 날짜를 사용합니다.
+    """
+    path = _path(code)
+    if not os.path.exists(path):
+        return None
+    try:
+        df = pd.read_parquet(path)
+    except Exception as e:
+        logger.warning(f"일봉 캐시 읽기 실패 ({path}): {str(e)}")
+        return None
+    if df.empty:
+        return None
+
+    history_start = df.index[0]
+    meta_path = _path(code, 'json')
+    if os.path.exists(meta_path):
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                history_start = min(history_start, pd.Timestamp(json.load(f)['history_start']))
+        except Exception as e:
+            logger.warning(f"일봉 캐시 메타데이터 읽기 실패 ({meta_path}): {str(e)}")
+    return df, history_start
+
+def _write(path, write):
+    # 동시 실행 시 읽는 쪽이 반쯤 쓰인 파일을 보지 않도록 교체 방식으로 저장
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        logger.warning(f"일봉 캐시 저장 실패 ({path}): {str(e)}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def _write_meta(path, history_start):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'history_start': history_start.strftime('%Y%m%d')}, f)
+
+def save(code, df, history_start=None):
+    """
+    종목별 일봉 캐시 저장 (None과 빈 DataFrame은 저장하지 않음)
+
+    Args:
+        code: 종목코드
+        df: 날짜 인덱스 일봉 DataFrame
+        history_start: 이 날짜부터의 일봉이 빠짐없이 들어 있음을 나타내는 기록 시작일
+            (조회 시작일, 없으면 첫 행 날짜)
+    """
+    if df is None or df.empty:
+        return
+
+    if history_start is None:
+        history_start = df.index[0]
+    os.makedirs(OHLCV_CACHE_DIR, exist_ok=True)
+    _write(_path(code), df.to_parquet)
+    _write(_path(code, 'json'), lambda path: _write_meta(path, pd.Timestamp(history_start)))
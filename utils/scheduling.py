@@ -0,0 +1,38 @@
+from datetime import datetime, timedelta
+
+def next_run_time(hour, minute, tz=None, weekdays_only=True):
+    """
+    다음 실행 예정 시각 계산
+
+    Args:
+        hour: 실행 시
+        minute: 실행 분
+        tz: 시간대 (None이면 시스템 로컬 시간)
+        weekdays_only: True면 주말은 건너뜀
+
+    Returns:
+        datetime: 지금 이후 가장 가까운 실행 시각
+    """
+    now = datetime.now(tz)
+    target = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if target <= now:
+        target += timedelta(days=1)
+    while weekdays_only and target.weekday() >= 5:  # 5: 토요일, 6: 일요일
+        target += timedelta(days=1)
+    return target
+
+def seconds_until(hour, minute, tz=None, weekdays_only=True):
+    """
+    다음 실행 예정 시각까지 남은 시간(초)
+
+    Args:
+        hour: 실행 시
+        minute: 실행 분
+        tz: 시간대 (None이면 시스템 로컬 시간)
+        weekdays_only: True면 주말은 건너뜀
+
+    Returns:
+        float: 남은 시간(초)
+    """
+    target = next_run_time(hour, minute, tz, weekdays_only)
+    return max(0.0, (target - datetime.now(tz)).total_seconds())
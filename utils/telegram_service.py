@@ -1,7 +1,64 @@
 import asyncio
+import logging
+import threading
 import telegram
 from config.config import TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, KOSPI_TELEGRAM_BOT_TOKEN, KOSPI_TELEGRAM_CHAT_ID
 
+logger = logging.getLogger(__name__)
+
+# 동기 호출이 결과를 기다리는 최대 시간(초)
+SEND_TIMEOUT = 60
+
+# 봇은 토큰별로 한 번만 생성해 HTTP 연결 풀을 재사용
+_bots = {}
+
+# 봇의 연결은 이벤트 루프에 묶이므로 호출마다 asyncio.run으로 새 루프를 만들지 않고
+# 백그라운드 스레드의 루프 하나에서 모든 전송을 실행
+_loop = None
+_loop_lock = threading.Lock()
+
+def _get_loop():
+    """전송용 백그라운드 이벤트 루프 (처음 호출 시 시작)"""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name='telegram-loop', daemon=True).start()
+        return _loop
+
+def _get_bot(token):
+    """
+    토큰별 봇 조회 (백그라운드 루프 안에서만 호출)
+    
+    Args:
+        token: 봇 토큰
+    
+    Returns:
+        telegram.Bot
+    """
+    bot = _bots.get(token)
+    if bot is None:
+        bot = _bots[token] = telegram.Bot(token=token)
+    return bot
+
+def _run(coro):
+    """
+    코루틴을 백그라운드 루프에서 실행하고 결과 대기
+    
+    Args:
+        coro: send_message/send_image 코루틴
+    
+    Returns:
+        성공 여부 (bool), 시간 초과 시 False
+    """
+    future = asyncio.run_coroutine_threadsafe(coro, _get_loop())
+    try:
+        return future.result(timeout=SEND_TIMEOUT)
+    except TimeoutError:
+        future.cancel()
+        logger.error(f"텔레그램 전송 시간 초과 ({SEND_TIMEOUT}초)")
+        return False
+
 async def send_message(message, is_kospi=False):
     """
     텔레그램 메시지 전송
@@ -17,16 +74,16 @@ async def send_message(message, is_kospi=False):
         token = KOSPI_TELEGRAM_BOT_TOKEN if is_kospi else TELEGRAM_BOT_TOKEN
         chat_id = KOSPI_TELEGRAM_CHAT_ID if is_kospi else TELEGRAM_CHAT_ID
         
-        bot = telegram.Bot(token=token)
+        bot = _get_bot(token)
         await bot.send_message(
             chat_id=chat_id, 
             text=message, 
             parse_mode='Markdown'
         )
-        print(f"텔레그램 메시지 전송 성공: {message[:30]}...")
+        logger.info(f"텔레그램 메시지 전송 성공: {message[:30]}...")
         return True
     except Exception as e:
-        print(f"텔레그램 메시지 전송 오류: {e}")
+        logger.error(f"텔레그램 메시지 전송 오류: {e}")
         return False
 
 # 동기 방식으로 메시지 전송 (다른 코드에서 호출하기 쉽게)
@@ -41,7 +98,7 @@ def send_telegram_message(message, is_kospi=False):
     Returns:
         성공 여부 (bool)
     """
-    return asyncio.run(send_message(message, is_kospi))
+    return _run(send_message(message, is_kospi))
 
 # 텔레그램 차트 이미지 전송
 async def send_image(image_path, caption=None, is_kospi=False):
@@ -60,7 +117,7 @@ async def send_image(image_path, caption=None, is_kospi=False):
         token = KOSPI_TELEGRAM_BOT_TOKEN if is_kospi else TELEGRAM_BOT_TOKEN
         chat_id = KOSPI_TELEGRAM_CHAT_ID if is_kospi else TELEGRAM_CHAT_ID
         
-        bot = telegram.Bot(token=token)
+        bot = _get_bot(token)
         with open(image_path, 'rb') as photo:
             await bot.send_photo(
                 chat_id=chat_id,
@@ -68,10 +125,10 @@ async def send_image(image_path, caption=None, is_kospi=False):
                 caption=caption,
                 parse_mode='Markdown'
             )
-        print(f"텔레그램 이미지 전송 성공: {image_path}")
+        logger.info(f"텔레그램 이미지 전송 성공: {image_path}")
         return True
     except Exception as e:
-        print(f"텔레그램 이미지 전송 오류: {e}")
+        logger.error(f"텔레그램 이미지 전송 오류: {e}")
         return False
 
 # 동기 방식으로 이미지 전송
@@ -87,4 +144,4 @@ def send_telegram_image(image_path, caption=None, is_kospi=False):
     Returns:
         성공 여부 (bool)
     """
-    return asyncio.run(send_image(image_path, caption, is_kospi)) 
\ No newline at end of file
+    return _run(send_image(image_path, caption, is_kospi)) 
\ No newline at end of file